@@ -0,0 +1,214 @@
+"""Run many headless episodes across processes and aggregate the results.
+
+An episode is one run of one of the five food layouts, played by one planner
+from a given seed and bomb phase until the snake wins, collides or runs out
+of ticks. Every planner is given the same list of episodes, so results can
+be compared pairwise.
+
+    python batch_runner.py --planners bfs a_star iddfs --episodes 500
+
+``--board-size``, ``--foods`` and ``--bombs`` swap the five classic layouts
+for generated ones (see layouts.py), seeded by ``--layout-seed``.
+
+``--record DIR`` saves a replay file per episode (see replay.py), so any
+episode can be re-run and checked tick by tick later. ``--trace DIR`` saves
+a fixed-width trace per episode instead (see traces.py): head, body length,
+bombs and planned path on every tick, for offline analysis with NumPy.
+
+``--profile FILE`` turns on instrumentation and writes one JSON line per
+episode with its planner call counts and planning/simulation time.
+``--metrics FILE`` collects each episode's metrics (see metrics.py) and writes
+their JSON lines there, with events down to ``--log-level``.
+"""
+import argparse
+import io
+import json
+import os
+import random
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from grid import BOARD_SIZE
+from instrumentation import Instrumentation
+from layouts import GeneratedLayouts
+from metrics import Metrics, level_from_name
+from replay import RecordingGame
+from snake_engine import BOMB_MOVE_INTERVAL, TOTAL_RUNS, HeadlessGame
+from traces import TraceWriter
+
+EpisodeSpec = namedtuple(
+    "EpisodeSpec",
+    "search_method layout seed bomb_phase max_ticks max_stall_ticks game_options instrument record_dir "
+    "trace_dir metrics_level",
+)
+# ``profile`` is the episode's Instrumentation export and ``metrics`` its metrics as
+# JSON lines, each None when not collected
+EpisodeResult = namedtuple(
+    "EpisodeResult",
+    "search_method layout seed bomb_phase outcome foods_collected move_counter penalties collisions ticks wall_time "
+    "profile metrics",
+)
+
+# A bomb's bounce repeats after this many moves on the standard board
+BOMB_CYCLE = 2 * BOARD_SIZE
+# A snake that has not moved for a full bomb cycle is not going to move again
+MAX_STALL_TICKS = BOMB_CYCLE * BOMB_MOVE_INTERVAL
+
+
+def make_specs(search_methods, episodes, seed=0, max_ticks=5000, max_stall_ticks=MAX_STALL_TICKS, game_options=None,
+               instrument=False, board_size=BOARD_SIZE, record_dir=None, trace_dir=None,
+               metrics_level=None):
+    """The same ``episodes`` layouts, seeds and bomb phases for every planner."""
+    rng = random.Random(seed)
+    bomb_cycle = 2 * board_size
+    episode_setups = [(index % TOTAL_RUNS + 1, seed + index, rng.randrange(bomb_cycle)) for index in range(episodes)]
+    return [EpisodeSpec(search_method, layout, episode_seed, bomb_phase, max_ticks, max_stall_ticks, game_options or {},
+                        instrument, record_dir, trace_dir, metrics_level)
+            for search_method in search_methods
+            for layout, episode_seed, bomb_phase in episode_setups]
+
+
+def run_episode(spec):
+    metrics = Metrics(io.StringIO(), spec.metrics_level) if spec.metrics_level is not None else None
+    # Per-call records would dwarf the result; the counters and percentiles are kept.
+    # Metrics get their planning latencies from the instrumentation too.
+    instrumentation = None
+    if spec.instrument or metrics is not None:
+        instrumentation = Instrumentation(keep_calls=False, metrics=metrics)
+    episode_name = f"{spec.search_method}-layout{spec.layout}-seed{spec.seed}"
+    trace = None
+    if spec.trace_dir:
+        trace = TraceWriter(os.path.join(spec.trace_dir, f"{episode_name}.trace"),
+                            metadata={"search_method": spec.search_method, "layout": spec.layout, "seed": spec.seed,
+                                      "bomb_phase": spec.bomb_phase})
+    start_time = time.perf_counter()
+    game_class = RecordingGame if spec.record_dir else HeadlessGame
+    game = game_class(search_method=spec.search_method, first_run=spec.layout, total_runs=spec.layout,
+                      bomb_phase=spec.bomb_phase, instrumentation=instrumentation, seed=spec.seed,
+                      trace=trace, metrics=metrics, **spec.game_options)
+    game.run(max_ticks=spec.max_ticks, max_stall_ticks=spec.max_stall_ticks)
+    wall_time = time.perf_counter() - start_time
+    if spec.record_dir:
+        game.save(os.path.join(spec.record_dir, f"{episode_name}.replay"))
+    if trace is not None:
+        trace.close()
+
+    if game.run_results:
+        result = game.run_results[0]
+        outcome, foods_collected, move_counter, penalties, ticks = (
+            result.outcome, result.foods_collected, result.move_counter, result.penalties, result.ticks)
+    else:
+        outcome, foods_collected, move_counter, penalties, ticks = (
+            "timeout", game.foods_collected, game.move_counter, game.penalties, game.tick - game.run_start_tick)
+        if metrics is not None:
+            # The run never ended, so the game never flushed it
+            metrics.flush(run=spec.layout, outcome=outcome, foods_collected=foods_collected,
+                          move_counter=move_counter, penalties=penalties, ticks=ticks)
+    return EpisodeResult(spec.search_method, spec.layout, spec.seed, spec.bomb_phase, outcome, foods_collected,
+                         move_counter, penalties, int(outcome == "collision"), ticks, wall_time,
+                         instrumentation.export() if spec.instrument else None,
+                         metrics.stream.getvalue() if metrics is not None else None)
+
+
+def run_batch(specs, workers=None, chunksize=8):
+    """Run ``specs`` on ``workers`` processes (all cores by default), keeping their order."""
+    if workers == 1:
+        return [run_episode(spec) for spec in specs]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(run_episode, specs, chunksize=chunksize))
+
+
+def summarize(results):
+    """Per-planner totals and means, keyed by search method."""
+    summary = {}
+    for result in results:
+        totals = summary.setdefault(result.search_method, {
+            "episodes": 0, "won": 0, "collision": 0, "timeout": 0,
+            "foods_collected": 0, "move_counter": 0, "penalties": 0, "wall_time": 0.0,
+            "planning_time": 0.0, "simulation_time": 0.0, "plan_calls": 0, "expanded": 0,
+        })
+        totals["episodes"] += 1
+        totals[result.outcome] += 1
+        totals["foods_collected"] += result.foods_collected
+        totals["move_counter"] += result.move_counter
+        totals["penalties"] += result.penalties
+        totals["wall_time"] += result.wall_time
+        if result.profile is not None:
+            totals["planning_time"] += result.profile["phase_seconds"]["planning"]
+            totals["simulation_time"] += result.profile["phase_seconds"]["simulation"]
+            totals["plan_calls"] += result.profile["counters"].get("plan_calls", 0)
+            totals["expanded"] += result.profile["counters"].get("expanded", 0)
+    for totals in summary.values():
+        episodes = totals["episodes"]
+        totals["mean_foods"] = totals["foods_collected"] / episodes
+        totals["mean_moves"] = totals["move_counter"] / episodes
+        totals["mean_wall_ms"] = 1000 * totals["wall_time"] / episodes
+        totals["mean_planning_ms"] = 1000 * totals["planning_time"] / episodes
+        totals["mean_simulation_ms"] = 1000 * totals["simulation_time"] / episodes
+        totals["mean_expanded_per_call"] = totals["expanded"] / totals["plan_calls"] if totals["plan_calls"] else 0.0
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate planners on many headless episodes in parallel.")
+    parser.add_argument("--planners", nargs="+", default=["bfs_search_with_obstacles", "a_star_search",
+                                                          "iddfs_search_with_obstacles"])
+    parser.add_argument("--episodes", type=int, default=100, help="episodes per planner")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-ticks", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=None, help="processes to use (default: all cores)")
+    parser.add_argument("--profile", metavar="FILE", help="instrument every episode and write the profiles here")
+    parser.add_argument("--metrics", metavar="FILE", help="write every episode's metrics here as JSON lines")
+    parser.add_argument("--log-level", default="warning", help="lowest level of metrics events to keep")
+    parser.add_argument("--record", metavar="DIR", help="save a replay file for every episode in DIR")
+    parser.add_argument("--trace", metavar="DIR", help="save a per-tick trace file for every episode in DIR")
+    parser.add_argument("--board-size", type=int, help="play generated layouts on a board this many tiles wide")
+    parser.add_argument("--foods", type=int, default=20, help="foods per generated layout")
+    parser.add_argument("--bombs", type=int, default=2, help="bombs per generated layout")
+    parser.add_argument("--bomb-placement", choices=["spread", "random"], default="spread")
+    parser.add_argument("--layout-seed", type=int, default=0)
+    args = parser.parse_args()
+
+    game_options = {}
+    board_size = BOARD_SIZE
+    max_stall_ticks = MAX_STALL_TICKS
+    if args.board_size:
+        board_size = args.board_size
+        game_options["layouts"] = GeneratedLayouts(board_size, args.foods, args.bombs, args.layout_seed,
+                                                   args.bomb_placement)
+        max_stall_ticks = 2 * board_size * BOMB_MOVE_INTERVAL
+    metrics_level = level_from_name(args.log_level) if args.metrics else None
+    specs = make_specs(args.planners, args.episodes, args.seed, args.max_ticks, max_stall_ticks, game_options,
+                       instrument=bool(args.profile), board_size=board_size, record_dir=args.record,
+                       trace_dir=args.trace, metrics_level=metrics_level)
+    for directory in (args.record, args.trace):
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+    start_time = time.perf_counter()
+    results = run_batch(specs, args.workers)
+    elapsed = time.perf_counter() - start_time
+
+    print(f"{'planner':<30} {'won':>5} {'coll':>5} {'t/o':>5} {'foods':>7} {'moves':>8} {'pen':>5} {'ms/ep':>8}")
+    for search_method, totals in summarize(results).items():
+        print(f"{search_method:<30} {totals['won']:>5} {totals['collision']:>5} {totals['timeout']:>5} "
+              f"{totals['mean_foods']:>7.2f} {totals['mean_moves']:>8.1f} {totals['penalties']:>5} "
+              f"{totals['mean_wall_ms']:>8.2f}")
+    print(f"{len(results)} episodes in {elapsed:.2f} s ({len(results) / elapsed:.0f} episodes/s)")
+
+    if args.profile:
+        print(f"{'planner':<30} {'plan ms/ep':>10} {'sim ms/ep':>10} {'expanded/call':>14}")
+        for search_method, totals in summarize(results).items():
+            print(f"{search_method:<30} {totals['mean_planning_ms']:>10.2f} {totals['mean_simulation_ms']:>10.2f} "
+                  f"{totals['mean_expanded_per_call']:>14.1f}")
+        with open(args.profile, "w") as output:
+            for result in results:
+                output.write(json.dumps(result._asdict()) + "\n")
+    if args.metrics:
+        with open(args.metrics, "w") as output:
+            for result in results:
+                output.write(result.metrics)
+
+
+if __name__ == "__main__":
+    main()
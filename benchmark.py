@@ -0,0 +1,259 @@
+"""Time the planners in isolation on fixed board states.
+
+Two kinds of scenario are measured:
+
+* ``recorded`` -- the queries a headless game actually issues on each of the
+  five food layouts, captured with their occupancy at the time;
+* ``synthetic`` -- random boards with a given snake length, obstacle density
+  and start-to-goal path distance, generated from a seed.
+
+Every planner answers the same queries. For each (planner, scenario) pair the
+report gives latency percentiles, nodes expanded, frontier pushes, peak
+frontier size, peak memory allocated per call and path optimality (path
+length over the breadth-first optimum). ``--output`` writes the report as
+JSON, and ``--baseline`` compares a run against an earlier report and lists
+regressions.
+
+    python benchmark.py --output bench.json
+    python benchmark.py --baseline bench.json --tolerance 0.25
+"""
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from collections import namedtuple
+
+from grid import OccupancyGrid
+from instrumentation import percentile
+from planners import get_planner, sweep
+from snake_engine import TOTAL_RUNS, HeadlessGame
+
+DEFAULT_PLANNERS = ["bfs", "bidirectional_bfs", "bitboard_bfs", "a_star", "bidirectional_a_star", "jps", "iddfs",
+                    "ida_star", "numpy_field"]
+
+BenchmarkQuery = namedtuple("BenchmarkQuery", "start goals obstacles optimal_length")
+
+
+class RecordingPlanner:
+    """Wraps a planner and keeps a snapshot of every query it is asked."""
+
+    def __init__(self, planner, queries):
+        self.planner = planner
+        self.name = planner.name
+        self.queries = queries
+
+    def plan(self, start, goals, obstacles):
+        self.queries.append((start, tuple(goals), obstacles.copy()))
+        return self.planner.plan(start, goals, obstacles)
+
+
+def with_optimal_lengths(raw_queries):
+    reference = get_planner("bfs")
+    queries = []
+    for start, goals, obstacles in raw_queries:
+        queries.append(BenchmarkQuery(start, goals, obstacles, len(reference.plan(start, goals, obstacles))))
+    return queries
+
+
+def recorded_scenarios(search_method="bfs", max_ticks=2000):
+    scenarios = {}
+    for layout in range(1, TOTAL_RUNS + 1):
+        raw_queries = []
+        game = HeadlessGame(search_method, first_run=layout, total_runs=layout)
+        game.planner = RecordingPlanner(game.planner, raw_queries)
+        game.run(max_ticks=max_ticks)
+        scenarios[f"recorded/layout{layout}"] = with_optimal_lengths(raw_queries)
+    return scenarios
+
+
+def random_snake(rng, occupancy, length):
+    size = occupancy.size
+    head = (rng.randrange(size), rng.randrange(size))
+    body = [head]
+    occupancy.add(head)
+    # Self-avoiding random walk away from the head; it may end early if boxed in
+    while len(body) < length:
+        column, row = body[-1]
+        options = [(column + x, row + y) for x, y in [(0, 1), (0, -1), (1, 0), (-1, 0)]
+                   if 0 <= column + x < size and 0 <= row + y < size and not occupancy.is_blocked((column + x, row + y))]
+        if not options:
+            break
+        segment = rng.choice(options)
+        body.append(segment)
+        occupancy.add(segment)
+    return head
+
+
+def synthetic_query(rng, size, snake_length, density, goal_distance):
+    occupancy = OccupancyGrid(size)
+    head = random_snake(rng, occupancy, snake_length)
+    for cell in range(size * size):
+        if not occupancy.cells[cell] and rng.random() < density:
+            occupancy.cells[cell] = 1
+    # Pick a goal whose real path distance is as close to goal_distance as the board allows
+    field = sweep(head, occupancy)
+    reachable = [cell for cell, distance in enumerate(field.distance) if distance > 0]
+    if not reachable:
+        return None
+    best = min(abs(field.distance[cell] - goal_distance) for cell in reachable)
+    cell = rng.choice([cell for cell in reachable if abs(field.distance[cell] - goal_distance) == best])
+    goal = (cell % size, cell // size)
+    return BenchmarkQuery(head, (goal,), occupancy, field.distance[cell] + 1)
+
+
+def synthetic_scenarios(sizes, snake_lengths, densities, goal_distances, count, seed):
+    scenarios = {}
+    for size in sizes:
+        for snake_length in snake_lengths:
+            for density in densities:
+                for goal_distance in goal_distances:
+                    rng = random.Random(f"{seed}/{size}/{snake_length}/{density}/{goal_distance}")
+                    queries = []
+                    while len(queries) < count:
+                        query = synthetic_query(rng, size, snake_length, density, goal_distance)
+                        if query is not None:
+                            queries.append(query)
+                    name = f"synthetic/size{size}/snake{snake_length}/density{density}/distance{goal_distance}"
+                    scenarios[name] = queries
+    return scenarios
+
+
+def measure(planner_name, queries, repeats, allocation_samples):
+    # Every timed call gets a new planner: one that remembered its last answer
+    # would otherwise time a cache hit
+    latencies = []
+    expanded = pushes = peak_frontier = 0
+    solved = optimal = 0
+    length_ratio = 0.0
+    for query in queries:
+        best = None
+        stats = None
+        for _ in range(repeats):
+            planner = get_planner(planner_name)
+            start_time = time.perf_counter_ns()
+            path = planner.plan(query.start, query.goals, query.obstacles)
+            elapsed = time.perf_counter_ns() - start_time
+            best = elapsed if best is None else min(best, elapsed)
+            if stats is None:
+                stats = planner.last_stats
+        latencies.append(best / 1000)
+        expanded += stats.expanded
+        pushes += stats.pushes
+        peak_frontier = max(peak_frontier, stats.peak_frontier)
+        if path and query.optimal_length:
+            solved += 1
+            optimal += len(path) == query.optimal_length
+            length_ratio += len(path) / query.optimal_length
+
+    # Allocation is measured in a separate pass because tracing slows every call down
+    allocated = []
+    tracemalloc.start()
+    for query in queries[:allocation_samples]:
+        tracemalloc.reset_peak()
+        planner = get_planner(planner_name)
+        baseline = tracemalloc.get_traced_memory()[0]
+        planner.plan(query.start, query.goals, query.obstacles)
+        allocated.append(tracemalloc.get_traced_memory()[1] - baseline)
+    tracemalloc.stop()
+
+    latencies.sort()
+    count = len(queries)
+    return {
+        "queries": count,
+        "p50_us": percentile(latencies, 0.50),
+        "p90_us": percentile(latencies, 0.90),
+        "p99_us": percentile(latencies, 0.99),
+        "max_us": latencies[-1] if latencies else 0.0,
+        "mean_expanded": expanded / count if count else 0.0,
+        "mean_pushes": pushes / count if count else 0.0,
+        "peak_frontier": peak_frontier,
+        "mean_peak_alloc_bytes": sum(allocated) / len(allocated) if allocated else 0.0,
+        "solved": solved,
+        "optimal": optimal,
+        "mean_length_ratio": length_ratio / solved if solved else None,
+    }
+
+
+def run_benchmark(planner_names, scenarios, repeats=3, allocation_samples=20):
+    results = []
+    for planner_name in planner_names:
+        try:
+            get_planner(planner_name)
+        except ImportError as error:
+            print(f"Skipping {planner_name}: {error}", file=sys.stderr)
+            continue
+        for scenario, queries in scenarios.items():
+            row = {"planner": planner_name, "scenario": scenario}
+            row.update(measure(planner_name, queries, repeats, allocation_samples))
+            results.append(row)
+    return results
+
+
+def find_regressions(results, baseline_results, tolerance):
+    """Rows whose latency or search effort grew by more than ``tolerance`` (a fraction)."""
+    baseline = {(row["planner"], row["scenario"]): row for row in baseline_results}
+    regressions = []
+    for row in results:
+        previous = baseline.get((row["planner"], row["scenario"]))
+        if previous is None:
+            continue
+        for metric in ("p50_us", "p90_us", "mean_expanded", "mean_peak_alloc_bytes"):
+            if previous[metric] and row[metric] > previous[metric] * (1 + tolerance):
+                regressions.append((row["planner"], row["scenario"], metric, previous[metric], row[metric]))
+        if row["optimal"] < previous["optimal"]:
+            regressions.append((row["planner"], row["scenario"], "optimal", previous["optimal"], row["optimal"]))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the path planners on recorded and synthetic boards.")
+    parser.add_argument("--planners", nargs="+", default=DEFAULT_PLANNERS)
+    parser.add_argument("--sizes", nargs="+", type=int, default=[35])
+    parser.add_argument("--snake-lengths", nargs="+", type=int, default=[1, 60])
+    parser.add_argument("--densities", nargs="+", type=float, default=[0.0, 0.2])
+    parser.add_argument("--goal-distances", nargs="+", type=int, default=[10, 40])
+    parser.add_argument("--queries", type=int, default=30, help="queries per synthetic scenario")
+    parser.add_argument("--repeats", type=int, default=3, help="timed calls per query; the fastest is kept")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-recorded", action="store_true", help="skip the recorded game scenarios")
+    parser.add_argument("--output", help="write the report as JSON to this file")
+    parser.add_argument("--baseline", help="earlier JSON report to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    scenarios = {} if args.no_recorded else recorded_scenarios()
+    scenarios.update(synthetic_scenarios(args.sizes, args.snake_lengths, args.densities, args.goal_distances,
+                                         args.queries, args.seed))
+    results = run_benchmark(args.planners, scenarios, args.repeats)
+
+    print(f"{'planner':<14} {'scenario':<50} {'p50us':>9} {'p99us':>9} {'expanded':>9} {'peakQ':>6} "
+          f"{'alloc':>8} {'optimal':>9}")
+    for row in results:
+        print(f"{row['planner']:<14} {row['scenario']:<50} {row['p50_us']:>9.1f} {row['p99_us']:>9.1f} "
+              f"{row['mean_expanded']:>9.1f} {row['peak_frontier']:>6} {row['mean_peak_alloc_bytes']:>8.0f} "
+              f"{row['optimal']:>4}/{row['solved']:<4}")
+
+    if args.output:
+        report = {
+            "python": platform.python_version(),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "seed": args.seed,
+            "results": results,
+        }
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=1)
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            regressions = find_regressions(results, json.load(baseline_file)["results"], args.tolerance)
+        for planner_name, scenario, metric, before, after in regressions:
+            print(f"REGRESSION {planner_name} {scenario} {metric}: {before:.1f} -> {after:.1f}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Whole-board bit sets for frontier-parallel breadth-first search.
+
+Bit ``row * size + column`` of a Python int stands for that cell, the same
+row-major numbering the rest of the code uses. Moving every cell of a set one
+step in a direction is then a single shift; the column masks stop cells
+from wrapping from one row's last column into the next row's first.
+"""
+from functools import lru_cache
+
+# bytes.translate table: zero counts become "0", any non-zero count "1"
+_OCCUPIED_DIGITS = bytes([ord("0")] + [ord("1")] * 255)
+
+
+class BoardMasks:
+    def __init__(self, size):
+        self.size = size
+        self.full = (1 << (size * size)) - 1
+        first_column = 0
+        for row in range(size):
+            first_column |= 1 << (row * size)
+        last_column = first_column << (size - 1)
+        self.not_first_column = self.full & ~first_column
+        self.not_last_column = self.full & ~last_column
+
+
+@lru_cache(maxsize=None)
+def board_masks(size):
+    return BoardMasks(size)
+
+
+def bits_from_cells(cells):
+    """Bit set of the non-zero entries of a row-major byte grid."""
+    digits = bytes(cells).translate(_OCCUPIED_DIGITS)
+    return int(digits[::-1], 2) if digits else 0
+
+
+def bits_from_tiles(tiles, size):
+    bits = 0
+    for column, row in tiles:
+        bits |= 1 << (row * size + column)
+    return bits
+
+
+def expand(frontier, masks):
+    """Every cell 4-adjacent to a cell of ``frontier``."""
+    size = masks.size
+    return (((frontier << 1) & masks.not_first_column)
+            | ((frontier >> 1) & masks.not_last_column)
+            | ((frontier << size) & masks.full)
+            | (frontier >> size))
+
+
+def frontier_layers(start_cell, free, goals, masks):
+    """Breadth-first layers from ``start_cell`` until a layer touches ``goals``.
+
+    Returns the list of layers (layer ``k`` holds the cells at distance
+    ``k``) and the bits of the goals reached, which is 0 when the free
+    region around the start holds no goal.
+    """
+    frontier = 1 << start_cell
+    reached = frontier
+    layers = [frontier]
+    while frontier:
+        found = frontier & goals
+        if found:
+            return layers, found
+        frontier = expand(frontier, masks) & free & ~reached
+        reached |= frontier
+        layers.append(frontier)
+    return layers, 0
+
+
+def backtrack(layers, goal_cell, size):
+    """Cells of one shortest path from the start to ``goal_cell``."""
+    cells = [goal_cell]
+    cell = goal_cell
+    for layer in reversed(layers[:-1]):
+        row, column = divmod(cell, size)
+        if column + 1 < size and layer >> (cell + 1) & 1:
+            cell += 1
+        elif column > 0 and layer >> (cell - 1) & 1:
+            cell -= 1
+        elif row + 1 < size and layer >> (cell + size) & 1:
+            cell += size
+        else:
+            cell -= size
+        cells.append(cell)
+    cells.reverse()
+    return cells
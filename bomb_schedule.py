@@ -0,0 +1,105 @@
+"""Precomputed bomb trajectories.
+
+Bombs bounce up and down their column on a fixed rule, so where each bomb
+will be at any future tick can be tabulated once per run instead of being
+re-simulated. The engine advances one tick per step and moves a bomb every
+``move_delay`` ticks, counted from ``last_move_tick``.
+"""
+from array import array
+from math import lcm
+
+
+def next_bounce_state(row, direction, size):
+    # Move one row in the current direction, or turn around at the edge
+    # without moving, exactly like the original Bomb.move.
+    if direction == "down":
+        if row < size - 1:
+            return row + 1, direction
+        return row, "up"
+    if row > 0:
+        return row - 1, direction
+    return row, "down"
+
+
+def bounce_cycle(row, direction, size):
+    """Rows visited from (row, direction) until the bounce repeats itself."""
+    rows = []
+    state = (row, direction)
+    while True:
+        rows.append(state[0])
+        state = next_bounce_state(state[0], state[1], size)
+        if state == (row, direction):
+            return rows
+
+
+class BombSchedule:
+    """Where every bomb is after each tick, for any tick.
+
+    Each bomb's bounce cycle is stored once as a compact array of rows, and
+    bombs are indexed by column, so ``is_occupied`` only looks at the bombs
+    sharing the tile's column. ``positions_at(tick)`` is where the bombs
+    stand once step ``tick`` has finished; while step ``tick`` is being
+    planned they still stand at ``positions_at(tick - 1)``.
+    """
+
+    def __init__(self, bombs, size):
+        self.size = size
+        self.tracks = []
+        self.tracks_by_column = {}
+        for bomb in bombs:
+            column, row = bomb.position
+            rows = array("H", bounce_cycle(row, bomb.direction, size))
+            self.tracks_by_column.setdefault(column, []).append(len(self.tracks))
+            self.tracks.append((column, rows, bomb.last_move_tick, bomb.move_delay))
+        self.period = 1
+        for _, rows, _, move_delay in self.tracks:
+            self.period = lcm(self.period, len(rows) * move_delay)
+        self._cells_by_phase = {}
+
+    def row_at(self, index, tick):
+        _, rows, last_move_tick, move_delay = self.tracks[index]
+        return rows[(tick - last_move_tick) // move_delay % len(rows)]
+
+    def positions_at(self, tick):
+        return [(track[0], self.row_at(index, tick)) for index, track in enumerate(self.tracks)]
+
+    def upcoming_positions(self, tick, moves):
+        """Each bomb's tile at ``tick`` followed by its tiles after the next ``moves`` moves."""
+        positions = []
+        for index, (column, _, _, move_delay) in enumerate(self.tracks):
+            for move in range(moves + 1):
+                positions.append((column, self.row_at(index, tick + move * move_delay)))
+        return positions
+
+    def is_occupied(self, tile, tick):
+        for index in self.tracks_by_column.get(tile[0], ()):
+            if self.row_at(index, tick) == tile[1]:
+                return True
+        return False
+
+    def cells_at(self, tick):
+        # Cached per phase: time-expanded searches ask for the same ticks repeatedly
+        phase = tick % self.period
+        cells = self._cells_by_phase.get(phase)
+        if cells is None:
+            cells = frozenset(row * self.size + column for column, row in self.positions_at(tick))
+            self._cells_by_phase[phase] = cells
+        return cells
+
+
+class TimedObstacles:
+    """Occupancy as seen by a time-expanded planner at step ``tick``.
+
+    ``cells`` is the live occupancy grid (snake and bombs where they stand
+    now), so planners that ignore time still see the bombs. ``static_cells``
+    leaves the bombs out; their future positions come from ``schedule``.
+    """
+
+    def __init__(self, occupancy, schedule, tick, bomb_tiles):
+        self.size = occupancy.size
+        self.cells = occupancy.cells
+        self.schedule = schedule
+        self.tick = tick
+        self.static_cells = bytearray(occupancy.cells)
+        for column, row in bomb_tiles:
+            self.static_cells[row * self.size + column] -= 1
@@ -0,0 +1,92 @@
+"""Fixed-timestep main loop for the pygame scripts.
+
+The simulation advances in whole ticks and the screen is drawn separately,
+in one of three modes:
+
+* real time (the default) -- wall-clock time is accumulated and one tick is
+  stepped for every ``tick_ms`` that has passed, so the snake moves at the
+  same speed whatever the frame rate;
+* ``ticks_per_frame=N`` -- exactly N ticks per drawn frame, with frames
+  still paced to ``fps``;
+* turbo (``render_every=K``) -- no pacing at all. The simulation runs at CPU
+  speed and a frame is drawn every K ticks, or only when a run ends if K is 0.
+  That frame is drawn from the game's ``on_run_end`` hook, so it shows how the
+  run ended rather than the next run's fresh board.
+
+The frame that ends the game is drawn too, before ``frame()`` reports it.
+"""
+import pygame
+
+# Real time never catches up more than this many ticks in one frame, so one
+# slow search cannot leave the loop further and further behind
+MAX_CATCH_UP_TICKS = 10
+# Turbo mode still looks at the event queue this often, so the window can be closed
+TURBO_EVENT_TICKS = 500
+
+
+class GameLoop:
+    def __init__(self, game, screen, tick_ms, fps=60, ticks_per_frame=None, render_every=None):
+        self.game = game
+        self.screen = screen
+        self.tick_ms = tick_ms
+        self.fps = fps
+        self.ticks_per_frame = ticks_per_frame
+        self.render_every = render_every
+        self.clock = pygame.time.Clock()
+        # Wall-clock milliseconds not yet turned into ticks
+        self.accumulator = 0
+        self.running = True
+        if render_every == 0:
+            game.on_run_end = self.draw
+
+    def handle_events(self):
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                self.running = False
+            elif event.type == pygame.VIDEOEXPOSE and self.game.renderer is not None:
+                # Part of the window was uncovered; repaint all of it
+                self.game.renderer.invalidate()
+
+    def draw(self):
+        self.game.draw(self.screen)
+
+    def frame(self):
+        """Step the simulation and draw one frame; False once the game is over or the window closed."""
+        self.handle_events()
+        if not self.running:
+            return False
+
+        if self.render_every is not None:
+            self.run_until_render()
+        elif self.ticks_per_frame is not None:
+            self.game.update(self.ticks_per_frame)
+            self.clock.tick(self.fps)
+        else:
+            self.accumulator += self.clock.tick(self.fps)
+            ticks = int(self.accumulator // self.tick_ms)
+            if ticks > MAX_CATCH_UP_TICKS:
+                ticks = MAX_CATCH_UP_TICKS
+                self.accumulator = 0
+            else:
+                self.accumulator -= ticks * self.tick_ms
+            self.game.update(ticks)
+
+        if not self.running:
+            return False
+        if self.render_every != 0:
+            self.draw()
+        return not self.game.game_over
+
+    def run_until_render(self):
+        game = self.game
+        runs_completed = game.runs_completed
+        ticks = 0
+        while not game.game_over and self.running:
+            game.update(1)
+            ticks += 1
+            if game.runs_completed != runs_completed:
+                return
+            if self.render_every and ticks >= self.render_every:
+                return
+            if ticks % TURBO_EVENT_TICKS == 0:
+                self.handle_events()
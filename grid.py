@@ -0,0 +1,105 @@
+"""Cell numbering and occupancy bookkeeping shared by the engine and planners.
+
+Cells are numbered row-major, ``row * size + column``, so a board can be held
+in flat arrays and a tile tuple converted with one multiply and add.
+"""
+from functools import lru_cache
+
+BOARD_SIZE = 35
+
+# Sentinels for the flat predecessor arrays used by the searches
+UNVISITED = -2
+NO_PARENT = -1
+
+
+def tile_from_cell(cell, size=BOARD_SIZE):
+    row, column = divmod(cell, size)
+    return (column, row)
+
+
+# Bits of ``neighbor_steps`` edge flags: which sides of the board a cell touches
+TOP, BOTTOM, LEFT, RIGHT = 1, 2, 4, 8
+
+
+@lru_cache(maxsize=None)
+def neighbor_steps(size=BOARD_SIZE):
+    """How to get from any row-major cell id to its 4-connected neighbours.
+
+    Returns ``(edges, steps)``. ``edges`` holds one byte per cell with the
+    board sides it touches, and ``steps[edges[cell]]`` is the tuple of
+    offsets that, added to ``cell``, give its neighbours: down, up, right,
+    left, leaving out those off the board. A per-cell table of neighbour
+    tuples costs about 220 bytes a cell; this is one byte a cell.
+    """
+    steps = []
+    for flags in range(16):
+        offsets = []
+        if not flags & BOTTOM:
+            offsets.append(size)
+        if not flags & TOP:
+            offsets.append(-size)
+        if not flags & RIGHT:
+            offsets.append(1)
+        if not flags & LEFT:
+            offsets.append(-1)
+        steps.append(tuple(offsets))
+
+    row = bytearray(size)
+    row[0] |= LEFT
+    row[-1] |= RIGHT
+    top_row = bytes(flags | TOP for flags in row)
+    bottom_row = bytes(flags | BOTTOM for flags in row)
+    if size == 1:
+        edges = bytearray(flags | BOTTOM for flags in top_row)
+    else:
+        edges = bytearray(top_row) + bytes(row) * (size - 2) + bottom_row
+    return edges, tuple(steps)
+
+
+def reconstruct_path(parent, goal_cell, size=BOARD_SIZE):
+    """Walk a predecessor array back from ``goal_cell`` to the search root.
+
+    The returned tiles run from the start to the goal, both included, which
+    is the shape every planner returns.
+    """
+    path = []
+    cell = goal_cell
+    while cell != NO_PARENT:
+        path.append(tile_from_cell(cell, size))
+        cell = parent[cell]
+    path.reverse()
+    return path
+
+
+class OccupancyGrid:
+    """Obstacle counts per cell, kept current by Snake and Bomb as they move.
+
+    Cells are numbered row-major (``row * self.size + column``). A count
+    rather than a flag is stored because the snake can briefly cover the
+    same tile twice while it grows, and a bomb may pass over the snake.
+    ``on_occupied``, when set, is called with the cell id each time a free
+    cell becomes occupied.
+    """
+
+    def __init__(self, size=BOARD_SIZE):
+        self.size = size
+        self.cells = bytearray(size * size)
+        self.on_occupied = None
+
+    def add(self, tile):
+        cell = tile[1] * self.size + tile[0]
+        self.cells[cell] += 1
+        if self.cells[cell] == 1 and self.on_occupied is not None:
+            self.on_occupied(cell)
+
+    def remove(self, tile):
+        self.cells[tile[1] * self.size + tile[0]] -= 1
+
+    def copy(self):
+        """A detached snapshot of the counts, without the ``on_occupied`` listener."""
+        grid = OccupancyGrid(self.size)
+        grid.cells[:] = self.cells
+        return grid
+
+    def is_blocked(self, tile):
+        return self.cells[tile[1] * self.size + tile[0]] != 0
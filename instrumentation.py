@@ -0,0 +1,88 @@
+"""Opt-in counters and timers for one game.
+
+A game only measures itself when it is given an ``Instrumentation``; with
+the default of ``None`` every hook in the engine is a single ``is not None``
+test. Once enabled, every planner call is recorded with the planner's
+``last_stats`` and its latency, and wall time is split into three phases:
+
+* ``planning`` -- inside planner calls and distance sweeps;
+* ``simulation`` -- the rest of ``HeadlessGame.step()``;
+* ``rendering`` -- inside the pygame scripts' ``draw()``.
+
+``export()`` returns a JSON-ready summary, so one object per episode gives
+per-episode numbers. Given a ``Metrics`` sink (see metrics.py), every
+planner call's latency and expansions also go into its per-run histograms.
+"""
+import json
+import time
+from collections import Counter, namedtuple
+
+PHASES = ("planning", "simulation", "rendering")
+
+PlanCall = namedtuple("PlanCall", "tick planner goals expanded pushes peak_frontier seconds")
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+class Instrumentation:
+    # The engine reads the clock through here so it never touches it itself
+    now = staticmethod(time.perf_counter)
+
+    def __init__(self, keep_calls=True, metrics=None):
+        self.keep_calls = keep_calls
+        self.metrics = metrics
+        self.reset()
+
+    def reset(self):
+        self.counters = Counter()
+        self.phase_seconds = dict.fromkeys(PHASES, 0.0)
+        self.plan_calls = []
+        self.plan_seconds = []
+
+    def count(self, name, amount=1):
+        self.counters[name] += amount
+
+    def add_time(self, phase, seconds):
+        self.phase_seconds[phase] += seconds
+
+    def record_plan(self, tick, planner_name, goals, stats, seconds):
+        """One planner call: what it searched for, what it cost and how long it took."""
+        self.phase_seconds["planning"] += seconds
+        self.plan_seconds.append(seconds)
+        self.counters["plan_calls"] += 1
+        self.counters["expanded"] += stats.expanded
+        self.counters["pushes"] += stats.pushes
+        if stats.peak_frontier > self.counters["peak_frontier"]:
+            self.counters["peak_frontier"] = stats.peak_frontier
+        if self.keep_calls:
+            self.plan_calls.append(PlanCall(tick, planner_name, goals, stats.expanded, stats.pushes,
+                                            stats.peak_frontier, seconds))
+        if self.metrics is not None:
+            self.metrics.observe("planning_latency_us", 1e6 * seconds)
+            self.metrics.observe("expanded", stats.expanded)
+
+    def export(self):
+        latencies = sorted(self.plan_seconds)
+        plan_calls = len(latencies)
+        report = {
+            "counters": dict(self.counters),
+            "phase_seconds": dict(self.phase_seconds),
+            "plan_latency_us": {
+                "p50": 1e6 * percentile(latencies, 0.50),
+                "p90": 1e6 * percentile(latencies, 0.90),
+                "p99": 1e6 * percentile(latencies, 0.99),
+                "max": 1e6 * latencies[-1] if latencies else 0.0,
+                "mean": 1e6 * sum(latencies) / plan_calls if plan_calls else 0.0,
+            },
+        }
+        if self.keep_calls:
+            report["plan_calls"] = [call._asdict() for call in self.plan_calls]
+        return report
+
+    def write_json(self, path):
+        with open(path, "w") as output:
+            json.dump(self.export(), output, indent=1)
@@ -0,0 +1,92 @@
+"""Board layouts: where the foods, the snake and the bombs start.
+
+A layout is plain data, so any board size works. The five hand-placed 35x35
+layouts of the original game are ``classic_layout(1)`` to
+``classic_layout(5)``. ``generate_layout`` builds layouts of any size,
+food count and bomb count from a seed, and ``GeneratedLayouts`` hands a
+game one of those per run.
+"""
+import random
+from collections import namedtuple
+
+from grid import BOARD_SIZE
+
+# ``bombs`` holds one (column, row, direction) per bomb; direction is "down" or "up"
+Layout = namedtuple("Layout", "size foods snake_start bombs")
+
+CLASSIC_FOODS = [
+    [(3, 3), (6, 10), (20, 5), (15, 22), (8, 27),
+     (30, 20), (25, 15), (19, 9), (12, 19), (5, 25),
+     (10, 6), (24, 28), (18, 13), (7, 29), (21, 16),
+     (26, 4), (9, 14), (13, 30), (4, 22), (31, 11)],
+    [(4, 5), (7, 12), (21, 6), (16, 23), (9, 28),
+     (31, 21), (26, 16), (20, 10), (13, 20), (6, 26),
+     (11, 7), (25, 29), (19, 14), (8, 30), (22, 17),
+     (27, 5), (10, 15), (14, 31), (5, 23), (32, 12)],
+    [(5, 7), (8, 14), (22, 8), (17, 25), (10, 30),
+     (32, 23), (27, 18), (21, 12), (14, 22), (7, 28),
+     (12, 9), (26, 31), (20, 16), (9, 32), (23, 19),
+     (28, 7), (11, 17), (15, 33), (6, 25), (33, 14)],
+    [(6, 9), (9, 16), (23, 10), (18, 27), (11, 32),
+     (33, 24), (28, 19), (22, 13), (15, 23), (8, 29),
+     (13, 10), (27, 32), (21, 17), (10, 33), (24, 20),
+     (29, 8), (12, 18), (16, 34), (7, 26), (34, 15)],
+    [(7, 11), (10, 18), (24, 11), (19, 28), (12, 33),
+     (34, 25), (29, 20), (23, 14), (16, 24), (9, 30),
+     (14, 11), (28, 33), (22, 18), (11, 34), (25, 21),
+     (30, 9), (13, 19), (17, 34), (8, 27), (34, 16)],
+]
+CLASSIC_BOMBS = ((5, 0, "down"), (29, 0, "down"))
+
+
+def classic_layout(run):
+    return Layout(BOARD_SIZE, CLASSIC_FOODS[run - 1], (BOARD_SIZE // 2, BOARD_SIZE // 2), CLASSIC_BOMBS)
+
+
+def generate_layout(size, food_count, bomb_count, seed, bomb_placement="spread"):
+    """A random layout on a ``size`` x ``size`` board, the same for the same arguments.
+
+    ``bomb_placement`` is "spread" (bombs on evenly spaced columns, starting
+    at the top and moving down, like the classic game) or "random" (random
+    columns, rows and directions, one bomb per column). Foods never start
+    on the snake or on a bomb.
+    """
+    if bomb_count > size:
+        raise ValueError(f"{bomb_count} bombs do not fit on {size} columns")
+    rng = random.Random(seed)
+    snake_start = (size // 2, size // 2)
+    if bomb_placement == "spread":
+        bombs = tuple(((2 * index + 1) * size // (2 * bomb_count), 0, "down") for index in range(bomb_count))
+    elif bomb_placement == "random":
+        bombs = tuple((column, rng.randrange(size), rng.choice(("down", "up")))
+                      for column in sorted(rng.sample(range(size), bomb_count)))
+    else:
+        raise ValueError(f"Unknown bomb placement {bomb_placement!r}; use 'spread' or 'random'")
+
+    taken = {snake_start[1] * size + snake_start[0]}
+    taken.update(row * size + column for column, row, _ in bombs)
+    if food_count > size * size - len(taken):
+        raise ValueError(f"{food_count} foods do not fit on a {size}x{size} board")
+    # Sampling cell ids from a range never builds a list of every cell
+    foods = []
+    while len(foods) < food_count:
+        for cell in rng.sample(range(size * size), food_count - len(foods)):
+            if cell not in taken:
+                taken.add(cell)
+                foods.append((cell % size, cell // size))
+    return Layout(size, foods, snake_start, bombs)
+
+
+class GeneratedLayouts:
+    """A fresh generated layout for every run, all derived from one seed."""
+
+    def __init__(self, size, food_count, bomb_count, seed=0, bomb_placement="spread"):
+        self.size = size
+        self.food_count = food_count
+        self.bomb_count = bomb_count
+        self.seed = seed
+        self.bomb_placement = bomb_placement
+
+    def __call__(self, run):
+        return generate_layout(self.size, self.food_count, self.bomb_count, f"{self.seed}/{run}",
+                               self.bomb_placement)
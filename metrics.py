@@ -0,0 +1,110 @@
+"""Counters, histograms and events of a game, written out as JSON lines.
+
+The engine used to print as it went ("Food eaten!", "Penalty applied", every
+alternative path in full). It now reports to an optional ``Metrics``
+instead. Counting or observing a value is a dict update, and events below
+``level`` are dropped on the spot, so the tick loop never writes anything.
+When a run ends the game calls ``flush()``, which writes that run's buffered
+events and then one summary line with its counters and histograms, all in one
+write, and starts the next run from zero.
+
+Levels are the ``logging`` ones. At the default, WARNING, only the summary
+lines are written; INFO adds run starts, wins, collisions, penalties and
+searches that found nothing; DEBUG adds every food, replan and alternative
+path.
+
+    {"event": "penalty", "level": "INFO", "tick": 57, "run": 1, "tile": [5, 12]}
+    {"event": "summary", "run": 1, "outcome": "won", ..., "counters": {...}, "histograms": {...}}
+"""
+import json
+import logging
+import math
+import sys
+from collections import Counter
+
+
+class Histogram:
+    """Count, mean, extremes and power-of-two buckets of the values added."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+        # Upper bound -> number of values above half of it and up to it
+        self.buckets = Counter()
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+        self.buckets[1 << max(0, math.ceil(value) - 1).bit_length()] += 1
+
+    def export(self):
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0.0,
+            "min": self.min,
+            "max": self.max,
+            "buckets": {str(bound): self.buckets[bound] for bound in sorted(self.buckets)},
+        }
+
+
+class Metrics:
+    """Buffers one run's metrics and events until ``flush()`` writes them to ``stream``.
+
+    ``stream`` defaults to standard output, looked up when flushing. The
+    sink never reads the clock: planning latency only shows up when an
+    ``Instrumentation`` is given the sink, ``Instrumentation(metrics=...)``.
+    """
+
+    def __init__(self, stream=None, level=logging.WARNING):
+        self.stream = stream
+        self.level = level
+        self.reset()
+
+    def reset(self):
+        self.counters = Counter()
+        self.histograms = {}
+        self.events = []
+
+    def count(self, name, amount=1):
+        self.counters[name] += amount
+
+    def observe(self, name, value):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram()
+        histogram.add(value)
+
+    def event(self, level, name, **fields):
+        """Count ``name``, and keep ``fields`` for the output if ``level`` is enabled."""
+        self.counters[name] += 1
+        if level >= self.level:
+            self.events.append((level, name, fields))
+
+    def export(self):
+        return {
+            "counters": dict(self.counters),
+            "histograms": {name: histogram.export() for name, histogram in self.histograms.items()},
+        }
+
+    def flush(self, **summary):
+        """Write the buffered events and a summary line holding ``summary``, then start over."""
+        lines = [json.dumps({"event": name, "level": logging.getLevelName(level), **fields})
+                 for level, name, fields in self.events]
+        lines.append(json.dumps({"event": "summary", **summary, **self.export()}))
+        stream = self.stream if self.stream is not None else sys.stdout
+        stream.write("\n".join(lines) + "\n")
+        self.reset()
+
+
+def level_from_name(name):
+    """``logging`` level for a name such as "info", for command-line options."""
+    level = logging.getLevelName(name.upper())
+    if not isinstance(level, int):
+        raise ValueError(f"Unknown log level {name!r}")
+    return level
@@ -0,0 +1,116 @@
+"""NumPy distance transforms over the whole board.
+
+A breadth-first wave is run on boolean arrays: each round shifts the whole
+frontier one cell in the four directions at once, so the cost per round is a
+handful of vectorised array operations, independent of how many cells the
+frontier holds. Running the wave backwards from every food at once gives the
+distance to the nearest food from every cell, and the snake then only has to
+walk downhill. Running it from the head instead gives the path length to
+every food, so one field ranks all of them and holds a path to each.
+Requires NumPy; nothing else in the project does.
+"""
+import numpy as np
+
+UNREACHED = -1
+
+
+def free_mask(cells, size):
+    """Boolean (row, column) array of the cells with no obstacle on them."""
+    return np.frombuffer(bytes(cells), dtype=np.uint8).reshape(size, size) == 0
+
+
+def distance_transform(sources, free):
+    """Hop count from the nearest ``sources`` cell to every cell of ``free``.
+
+    ``sources`` and ``free`` are boolean (row, column) arrays of the same
+    shape. Unreachable cells hold UNREACHED.
+    """
+    distance = np.full(free.shape, UNREACHED, dtype=np.int32)
+    frontier = sources & free
+    reached = frontier.copy()
+    distance[frontier] = 0
+    spread = np.empty_like(frontier)
+    step = 0
+    while frontier.any():
+        step += 1
+        spread[...] = False
+        spread[1:, :] |= frontier[:-1, :]
+        spread[:-1, :] |= frontier[1:, :]
+        spread[:, 1:] |= frontier[:, :-1]
+        spread[:, :-1] |= frontier[:, 1:]
+        frontier = spread & free & ~reached
+        reached |= frontier
+        distance[frontier] = step
+    return distance
+
+
+def goal_field(goals, cells, size):
+    """Distance to the nearest reachable goal tile, for every cell."""
+    sources = np.zeros((size, size), dtype=bool)
+    for column, row in goals:
+        sources[row, column] = True
+    return distance_transform(sources, free_mask(cells, size))
+
+
+def start_field(start, cells, size):
+    """Hop count from ``start`` to every cell; ``start`` may itself be blocked."""
+    free = free_mask(cells, size)
+    sources = np.zeros((size, size), dtype=bool)
+    column, row = start
+    free[row, column] = sources[row, column] = True
+    return distance_transform(sources, free)
+
+
+def descend(field, start):
+    """Follow ``field`` downhill from ``start`` to a goal; ``[]`` if none is reachable.
+
+    ``start`` itself may be blocked (it is the snake's head), so the first step
+    goes to its lowest reachable neighbour.
+    """
+    rows, columns = field.shape
+    column, row = start
+    current = int(field[row, column])
+    path = [start]
+    if current == 0:
+        return path
+    if current == UNREACHED:
+        best = None
+        for x, y in [(0, 1), (0, -1), (1, 0), (-1, 0)]:
+            if 0 <= column + x < columns and 0 <= row + y < rows:
+                distance = int(field[row + y, column + x])
+                if distance != UNREACHED and (best is None or distance < best):
+                    best = distance
+        if best is None:
+            return []
+        current = best + 1
+    while current > 0:
+        for x, y in [(0, 1), (0, -1), (1, 0), (-1, 0)]:
+            if 0 <= column + x < columns and 0 <= row + y < rows and field[row + y, column + x] == current - 1:
+                column, row = column + x, row + y
+                break
+        current -= 1
+        path.append((column, row))
+    return path
+
+
+class StartField:
+    """A ``start_field`` answering the queries of planners.DistanceField."""
+
+    def __init__(self, field, stats):
+        self.field = field
+        self.stats = stats
+
+    def distance_to(self, tile):
+        distance = int(self.field[tile[1], tile[0]])
+        return None if distance == UNREACHED else distance
+
+    def path_to(self, tile):
+        if self.distance_to(tile) is None:
+            return []
+        # Downhill from the tile ends on the start
+        return descend(self.field, tile)[::-1]
+
+    def nearest(self, tiles):
+        """Reachable ``tiles`` ordered by path length, ties kept in input order."""
+        reachable = [tile for tile in tiles if self.distance_to(tile) is not None]
+        return sorted(reachable, key=self.distance_to)
@@ -0,0 +1,66 @@
+"""Cache of planned paths that survives until the board actually gets in the way.
+
+Between two replans most of the board is unchanged: the snake moved one
+cell and the bombs moved one cell. A path found earlier is still walkable,
+from any tile on it, as long as none of the newly occupied cells lies further
+along it. The cache listens to the OccupancyGrid for cells that fill up and
+invalidates exactly the affected suffixes, so a replan from a tile on a
+cached path costs a dictionary lookup instead of a search.
+"""
+
+
+class CachedPath:
+    def __init__(self, path):
+        self.path = path
+        # Suffixes starting before this index run through a newly occupied cell
+        self.valid_from = 0
+
+
+class PlanCache:
+    def __init__(self):
+        self.suffixes = {}
+        self.entries_by_cell = {}
+        self.occupancy = None
+        self.hits = 0
+        self.misses = 0
+
+    def watch(self, occupancy):
+        # A new board means a new grid; nothing planned on the old one applies,
+        # and the old grid must not invalidate what is planned on the new one
+        if self.occupancy is not None and self.occupancy.on_occupied == self.invalidate_cell:
+            self.occupancy.on_occupied = None
+        self.clear()
+        self.occupancy = occupancy
+        self.size = occupancy.size
+        occupancy.on_occupied = self.invalidate_cell
+
+    def lookup(self, planner_name, start, goals):
+        """The cached path from ``start`` to ``goals``, or ``None`` on a miss."""
+        found = self.suffixes.get((planner_name, start, goals))
+        if found is not None:
+            entry, index = found
+            if index >= entry.valid_from:
+                self.hits += 1
+                return entry.path[index:]
+            del self.suffixes[planner_name, start, goals]
+        self.misses += 1
+        return None
+
+    def store(self, planner_name, goals, path):
+        entry = CachedPath(path)
+        # The path also answers a later query for the one goal it ended on
+        goal_keys = {goals, (path[-1],)}
+        for index, (column, row) in enumerate(path):
+            for goal_key in goal_keys:
+                self.suffixes[planner_name, (column, row), goal_key] = (entry, index)
+            self.entries_by_cell.setdefault(row * self.size + column, []).append((entry, index))
+
+    def invalidate_cell(self, cell):
+        # A suffix that merely starts on the cell is fine: that is the head moving along it
+        for entry, index in self.entries_by_cell.pop(cell, ()):
+            if index > entry.valid_from:
+                entry.valid_from = index
+
+    def clear(self):
+        self.suffixes.clear()
+        self.entries_by_cell.clear()
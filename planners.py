@@ -0,0 +1,862 @@
+"""Interchangeable path planners for the snake.
+
+Every planner exposes ``plan(start, goals, obstacles)``: ``start`` is a tile,
+``goals`` is an iterable of tiles and ``obstacles`` is an OccupancyGrid. It
+returns the tiles from ``start`` to the first goal it reaches, both included,
+or ``[]`` when no goal can be reached. Planners register themselves under one
+or more names, and ``HeadlessGame.search_method`` selects one by name at
+runtime, so adding a planner means adding a class here and nothing else.
+"""
+from collections import deque, namedtuple
+from heapq import heappop, heappush
+
+from bitboard import backtrack, bits_from_cells, bits_from_tiles, board_masks, frontier_layers
+from grid import NO_PARENT, UNVISITED, neighbor_steps, reconstruct_path, tile_from_cell
+
+PLANNERS = {}
+
+
+def register_planner(*names):
+    def decorator(planner_class):
+        for name in names:
+            PLANNERS[name] = planner_class
+        return planner_class
+    return decorator
+
+
+def get_planner(name, **options):
+    try:
+        planner_class = PLANNERS[name]
+    except KeyError:
+        raise ValueError(f"Unknown search method {name!r}, expected one of {available_planners()}") from None
+    return planner_class(**options)
+
+
+def available_planners():
+    return sorted(PLANNERS)
+
+
+def goal_cells(goals, size):
+    return {goal[1] * size + goal[0] for goal in goals}
+
+
+def nearest_goal_distance(column, row, goal_points):
+    """Manhattan distance to the nearest goal: admissible however many goals there are."""
+    return min(abs(column - x) + abs(row - y) for x, y in goal_points)
+
+
+# What the last plan() call cost: cells expanded, frontier pushes and the
+# largest the frontier got. Every planner fills in ``last_stats``.
+SearchStats = namedtuple("SearchStats", "expanded pushes peak_frontier")
+NO_SEARCH = SearchStats(0, 0, 0)
+
+
+@register_planner("bfs", "bfs_search_with_obstacles")
+class BreadthFirstPlanner:
+    name = "bfs"
+    last_stats = NO_SEARCH
+
+    def plan(self, start, goals, obstacles):
+        size = obstacles.size
+        blocked = obstacles.cells
+        edges, steps = neighbor_steps(size)
+        targets = goal_cells(goals, size)
+        if not targets:
+            self.last_stats = NO_SEARCH
+            return []
+        start_cell = start[1] * size + start[0]
+        parent = [UNVISITED] * len(blocked)
+        parent[start_cell] = NO_PARENT
+        queue = deque([start_cell])
+        path = []
+        expanded = 0
+        pushes = peak_frontier = 1
+        while queue:
+            if len(queue) > peak_frontier:
+                peak_frontier = len(queue)
+            current_cell = queue.popleft()
+            expanded += 1
+            if current_cell in targets:
+                path = reconstruct_path(parent, current_cell, size)
+                break
+            for step in steps[edges[current_cell]]:
+                neighbor = current_cell + step
+                if parent[neighbor] == UNVISITED and not blocked[neighbor]:
+                    parent[neighbor] = current_cell
+                    queue.append(neighbor)
+                    pushes += 1
+        self.last_stats = SearchStats(expanded, pushes, peak_frontier)
+        return path
+
+
+@register_planner("bitboard_bfs")
+class BitboardBreadthFirstPlanner:
+    """Breadth-first search that expands the whole frontier with a few shifts.
+
+    Same path lengths as BreadthFirstPlanner; among equally short paths it
+    may pick a different one. Each frontier layer counts as one push.
+    """
+    name = "bitboard_bfs"
+    last_stats = NO_SEARCH
+
+    def plan(self, start, goals, obstacles):
+        size = obstacles.size
+        masks = board_masks(size)
+        goal_bits = bits_from_tiles(goals, size)
+        if not goal_bits:
+            self.last_stats = NO_SEARCH
+            return []
+        free = masks.full & ~bits_from_cells(obstacles.cells)
+        layers, found = frontier_layers(start[1] * size + start[0], free, goal_bits, masks)
+        layer_sizes = [bin(layer).count("1") for layer in layers]
+        self.last_stats = SearchStats(sum(layer_sizes), len(layers), max(layer_sizes))
+        if not found:
+            return []
+        goal_cell = (found & -found).bit_length() - 1
+        return [tile_from_cell(cell, size) for cell in backtrack(layers, goal_cell, size)]
+
+
+@register_planner("numpy_field")
+class NumpyDistanceFieldPlanner:
+    """Walks downhill on a NumPy distance transform computed back from the goals.
+
+    One field answers "which goal is nearest, and how do I get there" for
+    every goal at once. ``sweep`` stands in for the module-level ``sweep``:
+    HeadlessGame builds one field from the head per replan with it and takes
+    both the food ranking and every fallback path from that field. Needs
+    NumPy, which is only imported when this planner is selected. Each wave
+    round counts as one push.
+    """
+    name = "numpy_field"
+    last_stats = NO_SEARCH
+
+    def __init__(self):
+        import numpy_field
+        self.fields = numpy_field
+
+    def plan(self, start, goals, obstacles):
+        goals = tuple(goals)
+        self.last_stats = NO_SEARCH
+        if start in goals:
+            return [start]
+        if not goals:
+            return []
+        field = self.fields.goal_field(goals, obstacles.cells, obstacles.size)
+        self.last_stats = self.field_stats(field)
+        return self.fields.descend(field, start)
+
+    def sweep(self, start, obstacles, goals=None):
+        """Like ``sweep``, but always over the whole board, so ``goals`` is not needed."""
+        field = self.fields.start_field(start, obstacles.cells, obstacles.size)
+        self.last_stats = self.field_stats(field)
+        return self.fields.StartField(field, self.last_stats)
+
+    def field_stats(self, field):
+        reached = int((field != self.fields.UNREACHED).sum())
+        return SearchStats(reached, int(field.max()) + 1, reached)
+
+
+@register_planner("a_star", "a_star_search")
+class AStarPlanner:
+    name = "a_star"
+    last_stats = NO_SEARCH
+
+    def plan(self, start, goals, obstacles):
+        size = obstacles.size
+        blocked = obstacles.cells
+        edges, steps = neighbor_steps(size)
+        goal_points = list(dict.fromkeys(goals))
+        if not goal_points:
+            self.last_stats = NO_SEARCH
+            return []
+        targets = goal_cells(goal_points, size)
+
+        parent = [UNVISITED] * len(blocked)
+        pq = [(0 + nearest_goal_distance(*start, goal_points), 0, start[1] * size + start[0], NO_PARENT)]
+        path = []
+        expanded = 0
+        pushes = peak_frontier = 1
+        while pq:
+            if len(pq) > peak_frontier:
+                peak_frontier = len(pq)
+            _, cost, current_cell, came_from = heappop(pq)
+            if parent[current_cell] != UNVISITED:
+                continue
+            parent[current_cell] = came_from
+            expanded += 1
+            if current_cell in targets:
+                path = reconstruct_path(parent, current_cell, size)
+                break
+            for step in steps[edges[current_cell]]:
+                neighbor = current_cell + step
+                if parent[neighbor] == UNVISITED and not blocked[neighbor]:
+                    new_cost = cost + 1
+                    row, column = divmod(neighbor, size)
+                    priority = new_cost + nearest_goal_distance(column, row, goal_points)
+                    heappush(pq, (priority, new_cost, neighbor, current_cell))
+                    pushes += 1
+        self.last_stats = SearchStats(expanded, pushes, peak_frontier)
+        return path
+
+
+def splice_paths(forward_parent, backward_parent, forward_cell, backward_cell, size):
+    # Start..forward_cell from the forward tree, then backward_cell..goal from
+    # the backward tree, whose roots are the goals
+    path = reconstruct_path(forward_parent, forward_cell, size)
+    path.extend(reversed(reconstruct_path(backward_parent, backward_cell, size)))
+    return path
+
+
+@register_planner("bidirectional_bfs")
+class BidirectionalBreadthFirstPlanner:
+    """Breadth-first search from the start and from every goal at once.
+
+    The side with the smaller frontier advances one whole layer at a time.
+    When a layer touches a cell the other side has reached, that layer is
+    finished and the shortest crossing found in it is spliced into the path,
+    so the result is as short as BreadthFirstPlanner's.
+    """
+    name = "bidirectional_bfs"
+    last_stats = NO_SEARCH
+
+    def plan(self, start, goals, obstacles):
+        size = obstacles.size
+        blocked = obstacles.cells
+        edges, steps = neighbor_steps(size)
+        start_cell = start[1] * size + start[0]
+        targets = goal_cells(goals, size)
+        if start_cell in targets:
+            self.last_stats = SearchStats(1, 1, 1)
+            return [start]
+        # Goals under an obstacle cannot be reached, as in the one-way search
+        sources = [cell for cell in targets if not blocked[cell]]
+        if not sources:
+            self.last_stats = NO_SEARCH
+            return []
+
+        # No parent arrays: a path is walked back down the distances instead
+        forward_distance = [-1] * len(blocked)
+        backward_distance = [-1] * len(blocked)
+        forward_distance[start_cell] = 0
+        for cell in sources:
+            backward_distance[cell] = 0
+        forward_frontier = [start_cell]
+        backward_frontier = sources
+        expanded = 0
+        pushes = peak_frontier = 1 + len(sources)
+
+        while forward_frontier and backward_frontier:
+            forward = len(forward_frontier) <= len(backward_frontier)
+            if forward:
+                frontier, distance, other_distance = forward_frontier, forward_distance, backward_distance
+            else:
+                frontier, distance, other_distance = backward_frontier, backward_distance, forward_distance
+            best = None
+            next_frontier = []
+            for current_cell in frontier:
+                expanded += 1
+                next_distance = distance[current_cell] + 1
+                for step in steps[edges[current_cell]]:
+                    neighbor = current_cell + step
+                    # Checked before ``blocked``: the start is under the snake's head
+                    if other_distance[neighbor] >= 0:
+                        total = next_distance + other_distance[neighbor]
+                        if best is None or total < best[0]:
+                            best = (total, current_cell, neighbor)
+                    elif distance[neighbor] < 0 and not blocked[neighbor]:
+                        distance[neighbor] = next_distance
+                        next_frontier.append(neighbor)
+                        pushes += 1
+            if best is not None:
+                self.last_stats = SearchStats(expanded, pushes, peak_frontier)
+                _, current_cell, neighbor = best
+                if not forward:
+                    current_cell, neighbor = neighbor, current_cell
+                path = self.walk_down(forward_distance, current_cell, edges, steps, size)
+                path.reverse()
+                path.extend(self.walk_down(backward_distance, neighbor, edges, steps, size))
+                return path
+            if forward:
+                forward_frontier = next_frontier
+            else:
+                backward_frontier = next_frontier
+            peak_frontier = max(peak_frontier, len(forward_frontier) + len(backward_frontier))
+        self.last_stats = SearchStats(expanded, pushes, peak_frontier)
+        return []
+
+    @staticmethod
+    def walk_down(distance, cell, edges, steps, size):
+        # From ``cell`` back to a root of its search tree, one lower distance at a time
+        tiles = [tile_from_cell(cell, size)]
+        while distance[cell]:
+            for step in steps[edges[cell]]:
+                neighbor = cell + step
+                if distance[neighbor] == distance[cell] - 1:
+                    cell = neighbor
+                    break
+            tiles.append(tile_from_cell(cell, size))
+        return tiles
+
+
+@register_planner("bidirectional_a_star")
+class BidirectionalAStarPlanner:
+    """A* from the start towards the goals and from the goals towards the start.
+
+    Each step advances the side with the smaller heap. Every edge that joins
+    the two search trees is a candidate path; the search stops once either
+    heap's best f-value is no better than the shortest candidate, which with
+    Manhattan heuristics on both sides means no shorter path is left.
+    """
+    name = "bidirectional_a_star"
+    last_stats = NO_SEARCH
+
+    def plan(self, start, goals, obstacles):
+        size = obstacles.size
+        blocked = obstacles.cells
+        edges, steps = neighbor_steps(size)
+        start_cell = start[1] * size + start[0]
+        goal_points = list(dict.fromkeys(goals))
+        targets = goal_cells(goal_points, size)
+        if start_cell in targets:
+            self.last_stats = SearchStats(1, 1, 1)
+            return [start]
+        sources = [cell for cell in targets if not blocked[cell]]
+        if not sources:
+            self.last_stats = NO_SEARCH
+            return []
+
+        def to_goals(cell):
+            row, column = divmod(cell, size)
+            return nearest_goal_distance(column, row, goal_points)
+
+        def to_start(cell):
+            row, column = divmod(cell, size)
+            return nearest_goal_distance(column, row, (start,))
+
+        forward_cost = [-1] * len(blocked)
+        backward_cost = [-1] * len(blocked)
+        forward_parent = [UNVISITED] * len(blocked)
+        backward_parent = [UNVISITED] * len(blocked)
+        forward_closed = bytearray(len(blocked))
+        backward_closed = bytearray(len(blocked))
+        forward_cost[start_cell] = 0
+        forward_parent[start_cell] = NO_PARENT
+        forward_pq = [(to_goals(start_cell), 0, start_cell)]
+        backward_pq = []
+        for cell in sources:
+            backward_cost[cell] = 0
+            backward_parent[cell] = NO_PARENT
+            heappush(backward_pq, (to_start(cell), 0, cell))
+        best = None
+        expanded = 0
+        pushes = peak_frontier = len(forward_pq) + len(backward_pq)
+
+        while forward_pq and backward_pq:
+            if best is not None and (forward_pq[0][0] >= best[0] or backward_pq[0][0] >= best[0]):
+                break
+            peak_frontier = max(peak_frontier, len(forward_pq) + len(backward_pq))
+            forward = len(forward_pq) <= len(backward_pq)
+            if forward:
+                pq, cost_of, parent, closed, other_cost, heuristic = (
+                    forward_pq, forward_cost, forward_parent, forward_closed, backward_cost, to_goals)
+            else:
+                pq, cost_of, parent, closed, other_cost, heuristic = (
+                    backward_pq, backward_cost, backward_parent, backward_closed, forward_cost, to_start)
+            _, cost, current_cell = heappop(pq)
+            if closed[current_cell] or cost > cost_of[current_cell]:
+                continue
+            closed[current_cell] = 1
+            expanded += 1
+            new_cost = cost + 1
+            for step in steps[edges[current_cell]]:
+                neighbor = current_cell + step
+                if other_cost[neighbor] >= 0:
+                    total = new_cost + other_cost[neighbor]
+                    if best is None or total < best[0]:
+                        best = (total, current_cell, neighbor, forward)
+                if blocked[neighbor] or closed[neighbor]:
+                    continue
+                if cost_of[neighbor] < 0 or new_cost < cost_of[neighbor]:
+                    cost_of[neighbor] = new_cost
+                    parent[neighbor] = current_cell
+                    heappush(pq, (new_cost + heuristic(neighbor), new_cost, neighbor))
+                    pushes += 1
+
+        self.last_stats = SearchStats(expanded, pushes, peak_frontier)
+        if best is None:
+            return []
+        _, current_cell, neighbor, forward = best
+        if forward:
+            return splice_paths(forward_parent, backward_parent, current_cell, neighbor, size)
+        return splice_paths(forward_parent, backward_parent, neighbor, current_cell, size)
+
+
+@register_planner("jps", "jump_point_search")
+class JumpPointPlanner:
+    """A* over jump points, for 4-connected uniform-cost grids.
+
+    Instead of pushing every open neighbour, each expansion jumps in a
+    straight line until something could make a turn worth taking there: a
+    goal, a forced neighbour (an open side cell whose counterpart one step
+    back is blocked) or, when moving vertically, a cell from which a
+    horizontal jump would stop. Only those jump points enter the heap, so on
+    an open board most of the cells A* expands are skipped. Paths are as
+    short as A*'s; ``expanded`` counts jump points, not cells scanned.
+    """
+    name = "jps"
+    last_stats = NO_SEARCH
+
+    def plan(self, start, goals, obstacles):
+        size = obstacles.size
+        blocked = obstacles.cells
+        goal_points = list(dict.fromkeys(goals))
+        if not goal_points:
+            self.last_stats = NO_SEARCH
+            return []
+        targets = goal_cells(goal_points, size)
+        start_cell = start[1] * size + start[0]
+        if start_cell in targets:
+            self.last_stats = SearchStats(1, 1, 1)
+            return [start]
+
+        def is_open(column, row):
+            return 0 <= column < size and 0 <= row < size and not blocked[row * size + column]
+
+        # Horizontal jumps are answered from per-row bit sets (bit = column),
+        # built the first time a row is crossed: the cells a jump would stop
+        # on in each direction, and the blocked cells that end it. Vertical
+        # jumps look sideways from every cell they pass, so this turns each
+        # of those looks into a couple of shifts instead of a scan.
+        row_full = (1 << size) - 1
+        free = board_masks(size).full & ~bits_from_cells(blocked)
+        target_bits = bits_from_tiles(goal_points, size)
+        row_masks = {}
+
+        def masks_for(row):
+            masks = row_masks.get(row)
+            if masks is None:
+                shift = row * size
+                open_bits = (free >> shift) & row_full
+                above = (free >> (shift - size)) & row_full if row > 0 else 0
+                below = (free >> (shift + size)) & row_full if row + 1 < size else 0
+                goals_here = (target_bits >> shift) & row_full
+                # Moving right onto column c forces a stop when the cell above
+                # (or below) c is open but the one above (below) c - 1 is not
+                stop_right = (goals_here | (above & ~(above << 1)) | (below & ~(below << 1))) & open_bits
+                stop_left = (goals_here | (above & ~(above >> 1)) | (below & ~(below >> 1))) & open_bits
+                masks = row_masks[row] = (stop_right, stop_left, ~open_bits & row_full)
+            return masks
+
+        def jump_horizontal(column, row, dx):
+            stop_right, stop_left, blocked_bits = masks_for(row)
+            if dx > 0:
+                ahead = (stop_right | blocked_bits) >> (column + 1)
+                if not ahead:
+                    return None
+                stop_column = column + (ahead & -ahead).bit_length()
+            else:
+                ahead = (stop_left | blocked_bits) & ((1 << column) - 1)
+                if not ahead:
+                    return None
+                stop_column = ahead.bit_length() - 1
+            if blocked_bits >> stop_column & 1:
+                return None
+            return row * size + stop_column
+
+        def jump_vertical(column, row, dy):
+            while True:
+                row += dy
+                if not is_open(column, row):
+                    return None
+                cell = row * size + column
+                if cell in targets:
+                    return cell
+                if ((is_open(column - 1, row) and not is_open(column - 1, row - dy))
+                        or (is_open(column + 1, row) and not is_open(column + 1, row - dy))):
+                    return cell
+                # A turn here matters if going sideways leads anywhere
+                if jump_horizontal(column, row, 1) is not None or jump_horizontal(column, row, -1) is not None:
+                    return cell
+
+        best_cost = {start_cell: 0}
+        parent = {start_cell: NO_PARENT}
+        closed = set()
+        pq = [(nearest_goal_distance(*start, goal_points), 0, start_cell, 0, 0)]
+        path = []
+        expanded = 0
+        pushes = peak_frontier = 1
+        while pq:
+            if len(pq) > peak_frontier:
+                peak_frontier = len(pq)
+            _, cost, current_cell, dx, dy = heappop(pq)
+            if current_cell in closed:
+                continue
+            closed.add(current_cell)
+            expanded += 1
+            if current_cell in targets:
+                path = self.unpack(parent, current_cell, size)
+                break
+            row, column = divmod(current_cell, size)
+            # Going back the way we came is never shorter, so only that direction is pruned
+            if dx:
+                directions = [(dx, 0), (0, 1), (0, -1)]
+            elif dy:
+                directions = [(0, dy), (1, 0), (-1, 0)]
+            else:
+                directions = [(0, 1), (0, -1), (1, 0), (-1, 0)]
+            for step_x, step_y in directions:
+                if step_x:
+                    jump_cell = jump_horizontal(column, row, step_x)
+                else:
+                    jump_cell = jump_vertical(column, row, step_y)
+                if jump_cell is None or jump_cell in closed:
+                    continue
+                jump_row, jump_column = divmod(jump_cell, size)
+                new_cost = cost + abs(jump_column - column) + abs(jump_row - row)
+                if new_cost < best_cost.get(jump_cell, new_cost + 1):
+                    best_cost[jump_cell] = new_cost
+                    parent[jump_cell] = current_cell
+                    priority = new_cost + nearest_goal_distance(jump_column, jump_row, goal_points)
+                    heappush(pq, (priority, new_cost, jump_cell, step_x, step_y))
+                    pushes += 1
+        self.last_stats = SearchStats(expanded, pushes, peak_frontier)
+        return path
+
+    @staticmethod
+    def unpack(parent, goal_cell, size):
+        # Jump points are joined by straight runs; fill in the cells between them
+        jump_points = reconstruct_path(parent, goal_cell, size)
+        path = [jump_points[0]]
+        for column, row in jump_points[1:]:
+            last_column, last_row = path[-1]
+            step_x = (column > last_column) - (column < last_column)
+            step_y = (row > last_row) - (row < last_row)
+            while path[-1] != (column, row):
+                last_column, last_row = path[-1]
+                path.append((last_column + step_x, last_row + step_y))
+        return path
+
+
+@register_planner("iddfs")
+class IterativeDeepeningPlanner:
+    name = "iddfs"
+    last_stats = NO_SEARCH
+
+    def __init__(self, max_depth=100):
+        self.max_depth = max_depth
+
+    def plan(self, start, goals, obstacles):
+        size = obstacles.size
+        blocked = obstacles.cells
+        edges, steps = neighbor_steps(size)
+        targets = goal_cells(goals, size)
+        start_cell = start[1] * size + start[0]
+        # One predecessor array and one visited mask, reused by every depth
+        parent = [NO_PARENT] * len(blocked)
+        visited = bytearray(len(blocked))
+        path = []
+        expanded = pushes = peak_frontier = 0
+        for depth in range(self.max_depth):
+            visited[:] = bytes(len(blocked))
+            stack = [(start_cell, 0, NO_PARENT)]
+            pushes += 1
+            while stack:
+                if len(stack) > peak_frontier:
+                    peak_frontier = len(stack)
+                current_cell, current_depth, came_from = stack.pop()
+                if current_cell in targets:
+                    parent[current_cell] = came_from
+                    path = reconstruct_path(parent, current_cell, size)
+                    break
+                if current_depth < depth:
+                    if visited[current_cell]:
+                        continue
+                    visited[current_cell] = 1
+                    parent[current_cell] = came_from
+                    expanded += 1
+                    for step in steps[edges[current_cell]]:
+                        neighbor = current_cell + step
+                        if not visited[neighbor] and not blocked[neighbor]:
+                            stack.append((neighbor, current_depth + 1, current_cell))
+                            pushes += 1
+            if path:
+                break
+        self.last_stats = SearchStats(expanded, pushes, peak_frontier)
+        return path
+
+
+@register_planner("ida_star", "iddfs_search_with_obstacles")
+class IterativeDeepeningAStarPlanner:
+    """Depth-first search under an f = g + h bound that grows between iterations.
+
+    Memory is the current path plus a transposition table of the lowest
+    cost each cell has been reached with, (cost, iteration). A cell reached
+    at a higher cost than the table's is pruned, in this iteration and every
+    later one, so a new iteration only re-walks routes that were best so
+    far; a cell already expanded at the same cost in this iteration is
+    pruned too. The table holds at most ``table_size`` cells. Once full it
+    stops taking new ones, which costs pruning but never correctness.
+    Paths are shortest, unlike IterativeDeepeningPlanner's.
+    """
+    name = "ida_star"
+    last_stats = NO_SEARCH
+
+    def __init__(self, table_size=1 << 16):
+        self.table_size = table_size
+
+    def plan(self, start, goals, obstacles):
+        size = obstacles.size
+        blocked = obstacles.cells
+        edges, steps = neighbor_steps(size)
+        goal_points = list(dict.fromkeys(goals))
+        targets = goal_cells(goal_points, size)
+        start_cell = start[1] * size + start[0]
+        if start_cell in targets:
+            self.last_stats = SearchStats(1, 1, 1)
+            return [start]
+        if not goal_points:
+            self.last_stats = NO_SEARCH
+            return []
+
+        def children(cell):
+            # Open neighbours, most promising last so that pop() takes it first
+            options = []
+            for step in steps[edges[cell]]:
+                neighbor = cell + step
+                if not blocked[neighbor]:
+                    row, column = divmod(neighbor, size)
+                    options.append((nearest_goal_distance(column, row, goal_points), neighbor))
+            options.sort(reverse=True)
+            return options
+
+        best_cost = {}
+        bound = nearest_goal_distance(*start, goal_points)
+        iteration = 0
+        path = []
+        expanded = pushes = 0
+        peak_frontier = 1
+        while not path:
+            iteration += 1
+            next_bound = None
+            best_cost[start_cell] = (0, iteration)
+            path_cells = [start_cell]
+            on_path = {start_cell}
+            costs = [0]
+            pending = [children(start_cell)]
+            while pending:
+                options = pending[-1]
+                if not options:
+                    pending.pop()
+                    on_path.discard(path_cells.pop())
+                    costs.pop()
+                    continue
+                estimate, neighbor = options.pop()
+                cost = costs[-1] + 1
+                if cost + estimate > bound:
+                    if next_bound is None or cost + estimate < next_bound:
+                        next_bound = cost + estimate
+                    continue
+                if neighbor in on_path:
+                    continue
+                entry = best_cost.get(neighbor)
+                if entry is not None and (cost > entry[0] or (cost == entry[0] and entry[1] == iteration)):
+                    continue
+                if entry is not None or len(best_cost) < self.table_size:
+                    best_cost[neighbor] = (cost, iteration)
+                path_cells.append(neighbor)
+                on_path.add(neighbor)
+                costs.append(cost)
+                pushes += 1
+                if len(path_cells) > peak_frontier:
+                    peak_frontier = len(path_cells)
+                if neighbor in targets:
+                    path = [tile_from_cell(cell, size) for cell in path_cells]
+                    break
+                expanded += 1
+                pending.append(children(neighbor))
+            if next_bound is None:
+                # Nothing was cut off by the bound, so every reachable cell was seen
+                break
+            bound = next_bound
+        self.last_stats = SearchStats(expanded, pushes, peak_frontier)
+        return path
+
+
+@register_planner("space_time_a_star")
+class SpaceTimeAStarPlanner:
+    """A* over (tile, tick) states that steps around the scheduled bombs.
+
+    Given TimedObstacles, the path it returns never puts the head on a cell a
+    bomb occupies just before or just after the head arrives, so it is
+    collision-free for the head by construction (a bomb can still run into
+    the trailing body, which is not part of the state). The head is expected
+    to advance one path tile per tick, starting with ``start`` at
+    ``obstacles.tick``. Bomb positions repeat every ``schedule.period``
+    ticks, so states are keyed by (cell, tick modulo period) and the search
+    stays finite even when no goal can be reached. Without a schedule it
+    behaves like plain A*.
+    """
+    name = "space_time_a_star"
+    time_expanded = True
+    last_stats = NO_SEARCH
+
+    def plan(self, start, goals, obstacles):
+        schedule = getattr(obstacles, "schedule", None)
+        if schedule is None:
+            fallback = AStarPlanner()
+            path = fallback.plan(start, goals, obstacles)
+            self.last_stats = fallback.last_stats
+            return path
+        size = obstacles.size
+        blocked = obstacles.static_cells
+        edges, steps = neighbor_steps(size)
+        start_cell = start[1] * size + start[0]
+        # Bombs only ever add obstacles, so a goal cut off on the static board
+        # is cut off at every tick. Dropping those first keeps an unreachable
+        # food from sending the search through every (cell, phase) state.
+        reached, expanded = static_reach(start_cell, goal_cells(goals, size), blocked, edges, steps)
+        goal_points = [goal for goal in dict.fromkeys(goals) if goal[1] * size + goal[0] in reached]
+        if not goal_points:
+            self.last_stats = SearchStats(expanded, expanded, 0)
+            return []
+        targets = goal_cells(goal_points, size)
+
+        cell_count = len(blocked)
+        period = schedule.period
+        start_tick = obstacles.tick
+        start_state = (start_tick % period) * cell_count + start_cell
+        parent = {}
+        pq = [(0 + nearest_goal_distance(*start, goal_points), 0, start_state, NO_PARENT)]
+        path = []
+        pushes = peak_frontier = 1
+        while pq:
+            if len(pq) > peak_frontier:
+                peak_frontier = len(pq)
+            _, cost, state, came_from = heappop(pq)
+            if state in parent:
+                continue
+            parent[state] = came_from
+            expanded += 1
+            current_cell = state % cell_count
+            if current_cell in targets:
+                path = reconstruct_timed_path(parent, state, cell_count, size)
+                break
+            arrival_tick = start_tick + cost + 1
+            # The head collides if a bomb stands on its new cell before or after the bombs move
+            before_move = schedule.cells_at(arrival_tick - 1)
+            after_move = schedule.cells_at(arrival_tick)
+            phase_offset = (arrival_tick % period) * cell_count
+            for step in steps[edges[current_cell]]:
+                neighbor = current_cell + step
+                if blocked[neighbor] or neighbor in before_move or neighbor in after_move:
+                    continue
+                next_state = phase_offset + neighbor
+                if next_state not in parent:
+                    row, column = divmod(neighbor, size)
+                    priority = cost + 1 + nearest_goal_distance(column, row, goal_points)
+                    heappush(pq, (priority, cost + 1, next_state, state))
+                    pushes += 1
+        self.last_stats = SearchStats(expanded, pushes, peak_frontier)
+        return path
+
+
+def static_reach(start_cell, targets, blocked, edges, steps):
+    """The ``targets`` a flood fill from ``start_cell`` reaches, and the cells it expanded.
+
+    Stops as soon as every target is found.
+    """
+    reached = set()
+    if start_cell in targets:
+        reached.add(start_cell)
+    seen = bytearray(len(blocked))
+    seen[start_cell] = 1
+    frontier = [start_cell]
+    expanded = 0
+    while frontier and len(reached) < len(targets):
+        cell = frontier.pop()
+        expanded += 1
+        for step in steps[edges[cell]]:
+            neighbor = cell + step
+            if not seen[neighbor] and not blocked[neighbor]:
+                seen[neighbor] = 1
+                frontier.append(neighbor)
+                if neighbor in targets:
+                    reached.add(neighbor)
+    return reached, expanded
+
+
+def reconstruct_timed_path(parent, state, cell_count, size):
+    path = []
+    while state != NO_PARENT:
+        row, column = divmod(state % cell_count, size)
+        path.append((column, row))
+        state = parent[state]
+    path.reverse()
+    return path
+
+
+class DistanceField:
+    """Hop counts and predecessors left behind by a breadth-first ``sweep``.
+
+    ``distance[cell]`` is -1 for cells the sweep never reached.
+    """
+
+    def __init__(self, size, distance, parent, stats=NO_SEARCH):
+        self.size = size
+        self.distance = distance
+        self.parent = parent
+        self.stats = stats
+
+    def distance_to(self, tile):
+        distance = self.distance[tile[1] * self.size + tile[0]]
+        return None if distance < 0 else distance
+
+    def path_to(self, tile):
+        cell = tile[1] * self.size + tile[0]
+        if self.distance[cell] < 0:
+            return []
+        return reconstruct_path(self.parent, cell, self.size)
+
+    def nearest(self, tiles):
+        """Reachable ``tiles`` ordered by path length, ties kept in input order."""
+        reachable = [tile for tile in tiles if self.distance_to(tile) is not None]
+        return sorted(reachable, key=self.distance_to)
+
+
+def sweep(start, obstacles, goals=None):
+    """Breadth-first sweep from ``start`` that records the distance to every cell.
+
+    The sweep stops as soon as every tile in ``goals`` has been reached, so a
+    single call replaces one search per goal. With ``goals=None`` it floods the
+    whole reachable board.
+    """
+    size = obstacles.size
+    blocked = obstacles.cells
+    edges, steps = neighbor_steps(size)
+    remaining = None if goals is None else goal_cells(goals, size)
+    start_cell = start[1] * size + start[0]
+    distance = [-1] * len(blocked)
+    parent = [UNVISITED] * len(blocked)
+    distance[start_cell] = 0
+    parent[start_cell] = NO_PARENT
+    queue = deque([start_cell])
+    expanded = 0
+    peak_frontier = 1
+    while queue:
+        if len(queue) > peak_frontier:
+            peak_frontier = len(queue)
+        current_cell = queue.popleft()
+        expanded += 1
+        if remaining is not None:
+            remaining.discard(current_cell)
+            if not remaining:
+                break
+        next_distance = distance[current_cell] + 1
+        for step in steps[edges[current_cell]]:
+            neighbor = current_cell + step
+            if distance[neighbor] < 0 and not blocked[neighbor]:
+                distance[neighbor] = next_distance
+                parent[neighbor] = current_cell
+                queue.append(neighbor)
+    # Every cell pushed was either expanded or is still waiting in the queue
+    return DistanceField(size, distance, parent, SearchStats(expanded, expanded + len(queue), peak_frontier))
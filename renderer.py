@@ -0,0 +1,155 @@
+"""Drawing shared by the pygame scripts.
+
+Loading and scaling a PNG or opening a font costs far more than blitting the
+result, so ``AssetCache`` does each of those once and hands back the same
+surface every frame afterwards. ``BoardRenderer`` draws the tile grid once
+and afterwards only repaints the parts of the screen that changed.
+"""
+from collections import Counter
+
+import pygame
+
+from snake_engine import TILE_SIZE
+
+# Colours
+BG_COLOR = (0, 0, 0)
+BLUE_COLOR = (83,41,110)
+SNAKE_COLOR = (209, 0, 0)
+TEXT_COLOR = (255, 255, 255)
+
+# A snake segment is a square of side 2 * SEGMENT_RADIUS around a point
+# TILE_SIZE // 2.5 pixels into its tile, the same square the scripts used to
+# draw out of four smaller rects.
+SEGMENT_RADIUS = TILE_SIZE * 2 // 4
+SEGMENT_OFFSET = int(TILE_SIZE // (5/2)) - SEGMENT_RADIUS
+FOOD_SPRITE_SIZE = (TILE_SIZE * 5 // 3, TILE_SIZE * 5 // 3)
+BOMB_SPRITE_SIZE = (TILE_SIZE * 2, TILE_SIZE * 2)
+LABEL_SPACING = 40
+
+
+class AssetCache:
+    """Sprites, fonts and rendered text, each built once and then reused."""
+
+    def __init__(self):
+        self.sprites = {}
+        self.fonts = {}
+        # Last text drawn in each slot and its surface
+        self.labels = {}
+
+    def sprite(self, path, size):
+        """``path`` loaded and scaled to ``size`` (width, height)."""
+        key = (path, size)
+        image = self.sprites.get(key)
+        if image is None:
+            image = pygame.transform.scale(pygame.image.load(path), size)
+            # convert_alpha() needs a display; without one the loaded format is kept
+            if pygame.display.get_surface() is not None:
+                image = image.convert_alpha()
+            self.sprites[key] = image
+        return image
+
+    def font(self, size):
+        font = self.fonts.get(size)
+        if font is None:
+            font = pygame.font.Font(None, size)
+            self.fonts[size] = font
+        return font
+
+    def text(self, slot, text, size, color):
+        """Rendered ``text`` for ``slot``, re-rendered only when the text changes."""
+        key = (text, size, color)
+        cached = self.labels.get(slot)
+        if cached is None or cached[0] != key:
+            cached = (key, self.font(size).render(text, True, color))
+            self.labels[slot] = cached
+        return cached[1]
+
+
+class BoardRenderer:
+    """Draws a game onto ``screen``, repainting only what changed since the last frame.
+
+    The background and tile grid are drawn once onto their own surface. Each
+    frame the game is turned into a list of sprites, ``(surface, position)``
+    in drawing order. Sprites that appeared, moved or went away mark their
+    rectangles dirty. Under those rectangles the background is restored and
+    every overlapping sprite is redrawn, clipped to the rectangle, and only
+    those rectangles are sent to the display.
+    """
+
+    def __init__(self, screen, font_size, assets=None):
+        self.screen = screen
+        self.font_size = font_size
+        self.assets = assets or AssetCache()
+        self.background = None
+        self.segment = pygame.Surface((2 * SEGMENT_RADIUS, 2 * SEGMENT_RADIUS))
+        self.segment.fill(SNAKE_COLOR)
+        # Sprites on screen after the last frame
+        self.sprites = []
+
+    def build_background(self, board):
+        background = pygame.Surface(self.screen.get_size())
+        background.fill(BG_COLOR)
+        for tile_x, tile_y in board.tile_pixels():
+            pygame.draw.rect(background, BLUE_COLOR, (tile_x, tile_y, TILE_SIZE, TILE_SIZE))
+        return background.convert(self.screen)
+
+    def invalidate(self):
+        """Repaint the whole screen on the next frame."""
+        self.background = None
+
+    def scene(self, game):
+        board = game.board
+        sprites = []
+        for segment in game.snake.body:
+            x, y = board.pixel_from_tile(segment)
+            sprites.append((self.segment, (x + SEGMENT_OFFSET, y + SEGMENT_OFFSET)))
+        food_image = self.assets.sprite("Food-Coin.png", FOOD_SPRITE_SIZE)
+        for food_position in board.foods:
+            sprites.append((food_image, board.pixel_from_tile(food_position)))
+        black_box_image = self.assets.sprite("Bomb1.png", BOMB_SPRITE_SIZE)
+        for bomb_tile in game.bomb_tiles():
+            sprites.append((black_box_image, board.pixel_from_tile(bomb_tile)))
+        labels = [
+            f"Run: {game.current_run}",
+            f"Run completed: {game.runs_completed}",
+            f"Food collected: {game.foods_collected}",
+            f"Move counter: {game.move_counter}",
+        ]
+        for index, text in enumerate(labels):
+            position = (10, 10 + LABEL_SPACING * index)
+            sprites.append((self.assets.text(position, text, self.font_size, TEXT_COLOR), position))
+        return sprites
+
+    def draw(self, game):
+        """Bring the screen up to date with ``game``; returns the rectangles repainted."""
+        sprites = self.scene(game)
+        screen = self.screen
+        if self.background is None:
+            self.background = self.build_background(game.board)
+            screen.blit(self.background, (0, 0))
+            for surface, position in sprites:
+                screen.blit(surface, position)
+            pygame.display.flip()
+            self.sprites = sprites
+            return [screen.get_rect()]
+
+        # Counted, not just compared as sets: a sprite blitted twice (two foods
+        # on one tile) looks different from the same sprite blitted once
+        previous = Counter(self.sprites)
+        current = Counter(sprites)
+        changed = [sprite for sprite in previous.keys() | current.keys() if previous[sprite] != current[sprite]]
+        dirty = [surface.get_rect(topleft=position) for surface, position in changed]
+        if dirty:
+            rects = [surface.get_rect(topleft=position) for surface, position in sprites]
+            for dirty_rect in dirty:
+                # Sprites overlap their neighbours' tiles, so repaint everything
+                # under the rectangle but nothing outside it
+                screen.set_clip(dirty_rect)
+                screen.blit(self.background, dirty_rect, dirty_rect)
+                for (surface, position), rect in zip(sprites, rects):
+                    if rect.colliderect(dirty_rect):
+                        screen.blit(surface, position)
+            screen.set_clip(None)
+            pygame.display.update(dirty)
+        self.sprites = sprites
+        return dirty
@@ -0,0 +1,207 @@
+"""Record headless episodes and replay them to check they still play the same.
+
+Given its options and seed, a game is fully deterministic: it advances in
+ticks, never reads the clock and draws anything random from its own seeded
+``Random``. A replay file therefore only needs those options, plus one small
+fixed-size record per tick to compare against:
+
+    magic b"SNKR", uint16 version, uint32 header length    (FILE_HEADER)
+    header: JSON with the game options and each run's RunResult
+    one TICK_RECORD per tick: uint32 tick, uint16 head column,
+        uint16 head row, uint8 event flags
+
+Replaying rebuilds the game from the options, steps it headless and stops
+at the first tick whose record differs, so a planner change that alters a
+single move is caught where it happens.
+
+    python replay.py record --search-method a_star_search --seed 7 episode.replay
+    python replay.py verify episode.replay
+"""
+import argparse
+import json
+import random
+import struct
+import time
+
+from layouts import GeneratedLayouts, classic_layout
+from snake_engine import TOTAL_RUNS, HeadlessGame, RunResult
+
+MAGIC = b"SNKR"
+VERSION = 1
+FILE_HEADER = struct.Struct("<4sHI")
+TICK_RECORD = struct.Struct("<IHHB")
+
+# Event flags of a tick record
+FOOD_EATEN = 1
+PENALTY = 2
+COLLISION = 4
+RUN_WON = 8
+
+
+class ReplayMismatch(Exception):
+    """A replayed episode diverged from its recording."""
+
+    def __init__(self, tick, expected, actual):
+        super().__init__(f"Replay diverged at tick {tick}: recorded {expected}, replayed {actual}")
+        self.tick = tick
+        self.expected = expected
+        self.actual = actual
+
+
+def layouts_from_config(config):
+    if config is None:
+        return classic_layout
+    return GeneratedLayouts(*config)
+
+
+def layouts_to_config(layouts):
+    if layouts is classic_layout:
+        return None
+    if isinstance(layouts, GeneratedLayouts):
+        return [layouts.size, layouts.food_count, layouts.bomb_count, layouts.seed, layouts.bomb_placement]
+    raise ValueError("Only classic and generated layouts can be recorded")
+
+
+class RecordingGame(HeadlessGame):
+    """A HeadlessGame that appends a tick record after every step.
+
+    Takes the same keyword options as HeadlessGame. Without a ``seed`` it
+    picks one, so that every recording can be replayed.
+    """
+
+    def __init__(self, **options):
+        if options.get("seed") is None:
+            options["seed"] = random.randrange(2 ** 32)
+        self.options = options
+        self.records = bytearray()
+        super().__init__(**options)
+
+    def config(self):
+        """The options as JSON-ready data."""
+        config = dict(self.options)
+        config.pop("instrumentation", None)
+        config.pop("trace", None)
+        config.pop("metrics", None)
+        config["layouts"] = layouts_to_config(config.get("layouts", classic_layout))
+        return config
+
+    def step(self):
+        if self.game_over:
+            return
+        # Held on to because a finished run replaces the board and the snake
+        board = self.board
+        snake = self.snake
+        foods_before = len(board.foods)
+        penalties_before = self.penalties
+        runs_before = len(self.run_results)
+        super().step()
+
+        flags = 0
+        if len(board.foods) < foods_before:
+            flags |= FOOD_EATEN
+        penalties = self.penalties
+        if len(self.run_results) > runs_before:
+            result = self.run_results[-1]
+            penalties = result.penalties
+            flags |= COLLISION if result.outcome == "collision" else RUN_WON
+        if penalties > penalties_before:
+            flags |= PENALTY
+        column, row = snake.head_position
+        self.records += TICK_RECORD.pack(self.tick, column, row, flags)
+
+    def save(self, path):
+        header = json.dumps({
+            "config": self.config(),
+            "ticks": len(self.records) // TICK_RECORD.size,
+            "results": [result._asdict() for result in self.run_results],
+        }).encode()
+        with open(path, "wb") as output:
+            output.write(FILE_HEADER.pack(MAGIC, VERSION, len(header)))
+            output.write(header)
+            output.write(self.records)
+
+
+class ReplayLog:
+    def __init__(self, config, results, records):
+        self.config = config
+        self.results = results
+        self.records = records
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as replay_file:
+            data = replay_file.read()
+        magic, version, header_length = FILE_HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} replay file")
+        start = FILE_HEADER.size
+        header = json.loads(data[start:start + header_length])
+        results = [RunResult(**result) for result in header["results"]]
+        return cls(header["config"], results, data[start + header_length:])
+
+    def __len__(self):
+        return len(self.records) // TICK_RECORD.size
+
+    def game_options(self):
+        options = dict(self.config)
+        options["layouts"] = layouts_from_config(options.get("layouts"))
+        return options
+
+
+def record_episode(max_ticks=None, max_stall_ticks=None, **options):
+    """Play one episode with ``options`` and return the RecordingGame."""
+    game = RecordingGame(**options)
+    game.run(max_ticks=max_ticks, max_stall_ticks=max_stall_ticks)
+    return game
+
+
+def replay(log):
+    """Re-run ``log`` and raise ReplayMismatch at the first tick that differs.
+
+    Returns the replayed game.
+    """
+    game = RecordingGame(**log.game_options())
+    size = TICK_RECORD.size
+    for index, expected in enumerate(TICK_RECORD.iter_unpack(log.records)):
+        game.step()
+        actual = TICK_RECORD.unpack_from(game.records, index * size) if len(game.records) > index * size else None
+        if actual != expected:
+            raise ReplayMismatch(expected[0], expected, actual)
+    if game.run_results != log.results:
+        raise ReplayMismatch(game.tick, log.results, game.run_results)
+    return game
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record a headless episode or verify a recorded one.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    record = commands.add_parser("record")
+    record.add_argument("output")
+    record.add_argument("--search-method", default="a_star_search")
+    record.add_argument("--seed", type=int)
+    record.add_argument("--first-run", type=int, default=1)
+    record.add_argument("--total-runs", type=int, default=TOTAL_RUNS)
+    record.add_argument("--bomb-phase", type=int, default=0)
+    record.add_argument("--multi-goal", action="store_true")
+    record.add_argument("--replan-each-tick", action="store_true")
+    record.add_argument("--max-ticks", type=int, default=5000)
+    verify = commands.add_parser("verify")
+    verify.add_argument("replay_file")
+    args = parser.parse_args()
+
+    if args.command == "record":
+        game = record_episode(max_ticks=args.max_ticks, search_method=args.search_method, seed=args.seed,
+                              first_run=args.first_run, total_runs=args.total_runs, bomb_phase=args.bomb_phase,
+                              multi_goal=args.multi_goal, replan_each_tick=args.replan_each_tick)
+        game.save(args.output)
+        print(f"Recorded {len(game.records) // TICK_RECORD.size} ticks (seed {game.seed}) to {args.output}")
+    else:
+        log = ReplayLog.load(args.replay_file)
+        start_time = time.perf_counter()
+        replay(log)
+        elapsed = time.perf_counter() - start_time
+        print(f"{args.replay_file}: {len(log)} ticks match ({len(log) / elapsed:.0f} ticks/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,577 @@
+"""Headless Snake Escape simulation shared by the IDDFS, A* and BFS scripts.
+
+Nothing in this module imports pygame, reads the wall clock or writes output:
+timing is left to an optional ``Instrumentation`` (see instrumentation.py)
+and reporting to an optional ``Metrics`` sink (see metrics.py), which the
+instrumentation also hands its planner timings to. The game only
+advances when ``HeadlessGame.step()`` is called, one discrete tick at a time,
+so a tick costs the search plus bookkeeping and nothing else. The pygame
+scripts (Test1_IDDFS.py, Test2_A_Star.py, Test3_BFS.py) subclass
+``HeadlessGame`` and decide *when* to step; batch evaluations can simply call
+``run()`` in a loop.
+"""
+import random
+from collections import deque, namedtuple
+from logging import DEBUG, INFO
+
+from bomb_schedule import BombSchedule, TimedObstacles, next_bounce_state
+from grid import BOARD_SIZE, OccupancyGrid
+from layouts import classic_layout
+from plan_cache import PlanCache
+from planners import get_planner, sweep
+
+# Constants
+WIDTH, HEIGHT = 600, 600
+TILE_SIZE = WIDTH // 40
+GAP_SIZE = 2
+TOTAL_RUNS = 5
+TILE_STEP = TILE_SIZE + GAP_SIZE
+# The GUI moves the snake roughly every 50 ms and the bombs every 200 ms,
+# so a bomb takes one step for every four snake ticks.
+BOMB_MOVE_INTERVAL = 4
+
+
+class Board:
+    """Foods and occupancy for one run, laid out from a ``layouts.Layout``.
+
+    Only the occupancy grid (one byte per cell) and the food list are
+    stored; tile pixels are computed on demand, so memory grows with the
+    number of cells and not with a dict of tuples.
+    """
+
+    def __init__(self, current_run, layout=None, rng=random):
+        self.layout = layout or classic_layout(current_run)
+        # The game's own Random, so that food drops follow its seed
+        self.rng = rng
+        self.size = self.layout.size
+        self.occupancy = OccupancyGrid(self.size)
+        self.foods = []
+        self.current_run = current_run
+        self.add_initial_foods()
+
+    def tile_pixels(self):
+        """Pixel position of every tile, row by row."""
+        for row in range(self.size):
+            for column in range(self.size):
+                yield (column * TILE_STEP, row * TILE_STEP)
+
+    # Tiles are laid out on a regular lattice, so both directions of the
+    # tile <-> pixel mapping are plain arithmetic instead of a dict scan.
+    def pixel_from_tile(self, tile):
+        return (tile[0] * TILE_STEP, tile[1] * TILE_STEP)
+
+    def tile_from_pixel(self, position):
+        column, x_offset = divmod(position[0], TILE_STEP)
+        row, y_offset = divmod(position[1], TILE_STEP)
+        if x_offset or y_offset or not self.in_bounds((column, row)):
+            return None
+        return (column, row)
+
+    def in_bounds(self, tile):
+        return 0 <= tile[0] < self.size and 0 <= tile[1] < self.size
+
+    def add_initial_foods(self):
+        self.foods.extend(self.layout.foods)
+
+    def add_food(self):
+        if len(set(self.foods)) >= self.size * self.size:
+            return
+        # Rejection sampling picks uniformly among the free tiles without listing them
+        while True:
+            food_position = (self.rng.randrange(self.size), self.rng.randrange(self.size))
+            if food_position not in self.foods:
+                self.foods.append(food_position)
+                return
+
+
+class Snake:
+    """The snake's segments, head first, in tile coordinates.
+
+    ``body`` is a deque, so moving costs the same however long the snake
+    is, and ``counts`` holds how many segments sit on each tile, so
+    ``occupies`` is a dictionary lookup rather than a scan of the body.
+    """
+
+    __slots__ = ("head_position", "body", "counts", "tail", "grow_pending", "occupancy")
+
+    def __init__(self, position, occupancy=None):
+        self.head_position = position
+        self.body = deque([position])
+        self.counts = {position: 1}
+        self.tail = None
+        self.grow_pending = False
+        self.occupancy = occupancy
+        if occupancy is not None:
+            occupancy.add(position)
+
+    def __len__(self):
+        return len(self.body)
+
+    def occupies(self, tile):
+        return tile in self.counts
+
+    def add_segment(self, tile):
+        self.counts[tile] = self.counts.get(tile, 0) + 1
+        if self.occupancy is not None:
+            self.occupancy.add(tile)
+
+    def remove_segment(self, tile):
+        if self.counts[tile] == 1:
+            del self.counts[tile]
+        else:
+            self.counts[tile] -= 1
+        if self.occupancy is not None:
+            self.occupancy.remove(tile)
+
+    def move(self, new_position):
+        self.head_position = new_position
+        self.body.appendleft(new_position)
+        self.add_segment(new_position)
+        if self.tail is None:
+            self.tail = self.body[-1]
+        else:
+            self.tail = self.body.pop()
+            self.remove_segment(self.tail)
+        if self.grow_pending:
+            self.grow()
+            self.grow_pending = False
+
+    def grow(self):
+        self.body.append(self.body[0])
+        self.add_segment(self.body[0])
+        if len(self.body) > 0:
+            self.tail = self.body[0]
+
+
+class Bomb:
+    def __init__(self, position, tick=0, move_delay=BOMB_MOVE_INTERVAL, occupancy=None, size=BOARD_SIZE,
+                 direction="down"):
+        self.position = position
+        self.direction = direction
+        self.size = size
+        self.move_delay = move_delay
+        self.last_move_tick = tick
+        self.occupancy = occupancy
+        if occupancy is not None:
+            occupancy.add(position)
+
+    def advance(self, moves):
+        # Start part-way through the bounce, as if ``moves`` moves had been made
+        previous_position = self.position
+        row = self.position[1]
+        for _ in range(moves):
+            row, self.direction = next_bounce_state(row, self.direction, self.size)
+        self.position = (self.position[0], row)
+        if self.occupancy is not None and self.position != previous_position:
+            self.occupancy.remove(previous_position)
+            self.occupancy.add(self.position)
+
+    def move(self, tick):
+        # At most one step per move_delay ticks, however often this is called
+        if tick - self.last_move_tick >= self.move_delay:
+            previous_position = self.position
+            row, self.direction = next_bounce_state(self.position[1], self.direction, self.size)
+            self.position = (self.position[0], row)
+            self.last_move_tick = tick
+            if self.occupancy is not None and self.position != previous_position:
+                self.occupancy.remove(previous_position)
+                self.occupancy.add(self.position)
+
+
+# One finished run: how it ended ("won" or "collision") and what it cost
+RunResult = namedtuple("RunResult", "run outcome foods_collected move_counter penalties ticks")
+
+
+class HeadlessGame:
+    def __init__(self, search_method="a_star_search", multi_goal=False, replan_each_tick=False,
+                 first_run=1, total_runs=TOTAL_RUNS, bomb_phase=0, instrumentation=None, layouts=classic_layout,
+                 seed=None, trace=None, metrics=None):
+        self.search_method = search_method
+        # Everything random in a game draws from here, so a seed reproduces it
+        self.seed = seed
+        self.rng = random.Random(seed)
+        # Run number -> layouts.Layout; see layouts.GeneratedLayouts for other board sizes
+        self.layouts = layouts
+        # Rank foods by path length with one sweep instead of by Manhattan distance
+        # (numpy_field always does: its one field per replan is that sweep)
+        self.multi_goal = multi_goal
+        # Check the remaining path against the board on every tick, not just once
+        self.replan_each_tick = replan_each_tick
+        # Number of bomb moves already made when a run starts
+        self.bomb_phase = bomb_phase
+        # Off by default; every hook checks for None before measuring anything
+        self.instrumentation = instrumentation
+        # Per-tick records for offline analysis (traces.TraceWriter), also off by default
+        self.trace = trace
+        # Counters, histograms and events, written out when each run ends
+        self.metrics = metrics
+        # Called with no arguments when a run ends, while its last state is still
+        # on the board (game_loop.GameLoop draws it there in turbo mode)
+        self.on_run_end = None
+        self.total_runs = total_runs
+        self.plan_cache = PlanCache()
+        self.tick = 0
+        self.game_over = False
+        self.current_run = first_run
+        self.runs_completed = 0
+        self.win_counter = 0
+        self.run_results = []
+        self.reset_run()
+
+    @property
+    def search_method(self):
+        return self._search_method
+
+    @search_method.setter
+    def search_method(self, name):
+        # Resolve the name eagerly so a typo fails here, not on the first replan
+        self.planner = get_planner(name)
+        self._search_method = name
+
+    def reset_run(self):
+        layout = self.layouts(self.current_run)
+        self.board = Board(self.current_run, layout, self.rng)
+        self.plan_cache.watch(self.board.occupancy)
+        self.snake = Snake(layout.snake_start, self.board.occupancy)
+        self.move_sequence = []
+        self.shortest_path = []
+        self.foods_collected = 0
+        self.move_counter = 0
+        self.penalties = 0
+        self.run_start_tick = self.tick
+        self.black_boxes = [Bomb((column, row), self.tick, occupancy=self.board.occupancy, size=layout.size,
+                                 direction=direction)
+                            for column, row, direction in layout.bombs]
+        for box in self.black_boxes:
+            box.advance(self.bomb_phase)
+        self.bomb_schedule = BombSchedule(self.black_boxes, layout.size)
+        # The tick whose end-of-step bomb positions are on the board right now
+        self.bomb_tick = self.tick
+
+    def next_run(self, outcome):
+        if self.game_over:
+            return
+        self.run_results.append(RunResult(self.current_run, outcome, self.foods_collected, self.move_counter,
+                                          self.penalties, self.tick - self.run_start_tick))
+        if self.metrics is not None:
+            # The end of a run is the end of an episode: its events and totals go out now
+            self.metrics.flush(**self.run_results[-1]._asdict())
+        self.runs_completed += 1
+        if self.on_run_end is not None:
+            self.on_run_end()
+        self.current_run += 1
+        if self.current_run > self.total_runs:
+            self.game_over = True
+            return
+        self.reset_run()
+        self.board.add_initial_foods()
+        self.report(INFO, "run_started")
+
+    def report(self, level, name, **fields):
+        """Hand an event to the metrics sink, if there is one."""
+        if self.metrics is not None:
+            self.metrics.event(level, name, tick=self.tick, run=self.current_run, **fields)
+
+    def run(self, max_ticks=None, max_stall_ticks=None):
+        """Step until every run is finished.
+
+        Stops early after ``max_ticks`` ticks, or once the snake has not
+        moved for ``max_stall_ticks`` ticks in a row (no planner finds a
+        path). Returns the number of ticks stepped.
+        """
+        start_tick = self.tick
+        last_progress = (self.current_run, self.move_counter)
+        last_progress_tick = self.tick
+        while not self.game_over:
+            if max_ticks is not None and self.tick - start_tick >= max_ticks:
+                break
+            self.step()
+            if max_stall_ticks is not None:
+                progress = (self.current_run, self.move_counter)
+                if progress != last_progress:
+                    last_progress = progress
+                    last_progress_tick = self.tick
+                elif self.tick - last_progress_tick >= max_stall_ticks:
+                    break
+        return self.tick - start_tick
+
+    def bomb_tiles(self):
+        return self.bomb_schedule.positions_at(self.bomb_tick)
+
+    def check_collision_with_black_boxes(self):
+        for bomb_tile in self.bomb_tiles():
+            if self.snake.occupies(bomb_tile):
+                return True
+        return False  # Return False if no collision is detected
+
+    def apply_penalty(self, next_tile):
+        # Only the bombs in the tile's column are looked at, not every bomb's position
+        if self.bomb_schedule.is_occupied(next_tile, self.bomb_tick):
+            self.move_counter += 5
+            self.penalties += 1
+            self.report(INFO, "penalty", tile=next_tile)
+
+    def search(self, start, goal):
+        return self.plan(start, [goal])
+
+    def plan(self, start, goals):
+        goals = tuple(goals)
+        path = self.plan_cache.lookup(self.search_method, start, goals)
+        if path is None:
+            path = self.run_planner(start, goals, self.board.occupancy)
+            if path:
+                self.plan_cache.store(self.search_method, goals, path)
+        return path
+
+    def run_planner(self, start, goals, obstacles):
+        if self.instrumentation is None:
+            return self.planner.plan(start, goals, obstacles)
+        start_time = self.instrumentation.now()
+        path = self.planner.plan(start, goals, obstacles)
+        self.instrumentation.record_plan(self.tick, self.search_method, len(goals), self.planner.last_stats,
+                                         self.instrumentation.now() - start_time)
+        return path
+
+    def run_sweep(self, start, goals):
+        # numpy_field sweeps the board with its own vectorised wave
+        board_sweep = getattr(self.planner, "sweep", sweep)
+        if self.instrumentation is None:
+            return board_sweep(start, self.board.occupancy, goals)
+        start_time = self.instrumentation.now()
+        field = board_sweep(start, self.board.occupancy, goals)
+        self.instrumentation.record_plan(self.tick, "sweep" if board_sweep is sweep else self.search_method,
+                                         len(goals), field.stats, self.instrumentation.now() - start_time)
+        return field
+
+    def refresh_move_sequence(self):
+        # Re-plan the rest of the current path every tick. While nothing has
+        # moved onto it this is a cache hit; otherwise the snake detours.
+        target = self.move_sequence[-1]
+        path = self.search(self.snake.head_position, target)
+        self.move_sequence = path[1:]
+
+    def heuristic_distance(self, start, target):
+        return abs(start[0] - target[0]) + abs(start[1] - target[1])
+
+    def predict_black_box_positions(self):
+        # Current positions plus the next 3 moves of each black box, read from
+        # the schedule so the live bombs are left where they are
+        return self.bomb_schedule.upcoming_positions(self.bomb_tick, 3)
+
+    def generate_path_to_food_with_obstacles(self):
+        if not self.board.foods:
+            return
+
+        if getattr(self.planner, "time_expanded", False):
+            self.generate_time_expanded_path()
+            return
+
+        if self.multi_goal or hasattr(self.planner, "sweep"):
+            self.generate_path_from_distance_field()
+            return
+
+        snake_tile = self.snake.head_position
+        closest_food = None
+        min_distance = float('inf')
+
+        for food_tile in self.board.foods:
+            distance = abs(snake_tile[0] - food_tile[0]) + abs(snake_tile[1] - food_tile[1])
+            if distance < min_distance:
+                min_distance = distance
+                closest_food = food_tile
+
+        if closest_food:
+            future_black_box_positions = self.predict_black_box_positions()
+
+            # Generate path considering future black box positions
+            self.shortest_path = self.search(snake_tile, closest_food)
+
+            # Check if the path intersects with future black box positions
+            intersects_future_position = any(tile in future_black_box_positions for tile in self.shortest_path)
+
+            # If the path intersects with future positions, find an alternative path
+            if intersects_future_position:
+                self.report(DEBUG, "path_blocked", food=closest_food)
+                # One search towards every food at once, stopping at the first reached
+                self.shortest_path = self.plan(snake_tile, self.board.foods)
+
+                if not self.shortest_path:
+                    self.report(INFO, "no_alternative_path")
+                    return
+                else:
+                    self.report(DEBUG, "alternative_path", length=len(self.shortest_path))
+
+    def generate_time_expanded_path(self):
+        # The planner dodges the scheduled bomb positions tick by tick, so the
+        # path needs no prediction pass and no intersect-and-replan loop.
+        snake_tile = self.snake.head_position
+        closest_food = min(self.board.foods, key=lambda food_tile: self.heuristic_distance(snake_tile, food_tile))
+        obstacles = TimedObstacles(self.board.occupancy, self.bomb_schedule, self.tick, self.bomb_tiles())
+        self.shortest_path = self.run_planner(snake_tile, [closest_food], obstacles)
+        if not self.shortest_path:
+            self.shortest_path = self.run_planner(snake_tile, self.board.foods, obstacles)
+            if not self.shortest_path:
+                self.report(INFO, "waiting_for_bombs")
+
+    def generate_path_from_distance_field(self):
+        # A single sweep ranks every food by real path length, so both the
+        # first choice and any fallback come out of the same search.
+        field = self.run_sweep(self.snake.head_position, self.board.foods)
+        ranked_foods = field.nearest(self.board.foods)
+        if not ranked_foods:
+            self.shortest_path = []
+            return
+
+        future_black_box_positions = self.predict_black_box_positions()
+        self.shortest_path = field.path_to(ranked_foods[0])
+        if any(tile in future_black_box_positions for tile in self.shortest_path):
+            self.report(DEBUG, "path_blocked", food=ranked_foods[0])
+            self.shortest_path = []
+            for food_tile in ranked_foods[1:]:
+                alternative_path = field.path_to(food_tile)
+                if not any(tile in future_black_box_positions for tile in alternative_path):
+                    self.shortest_path = alternative_path
+                    break
+
+            if not self.shortest_path:
+                self.report(INFO, "no_alternative_path")
+            else:
+                self.report(DEBUG, "alternative_path", length=len(self.shortest_path))
+
+    def generate_path_to_food(self):
+        if not self.board.foods:
+            return
+
+        snake_tile = self.snake.head_position
+        closest_food = None
+        min_distance = float('inf')
+
+        for food_tile in self.board.foods:
+            distance = abs(snake_tile[0] - food_tile[0]) + abs(snake_tile[1] - food_tile[1])
+            if distance < min_distance:
+                min_distance = distance
+                closest_food = food_tile
+
+        if closest_food:
+            self.shortest_path = self.search(snake_tile, closest_food)
+
+            bomb_tiles = self.bomb_tiles()
+            if any(tile in bomb_tiles for tile in self.shortest_path):
+                self.shortest_path = self.plan(snake_tile, self.board.foods)
+
+                if not self.shortest_path:
+                    self.report(INFO, "no_alternative_path")
+                    return
+                else:
+                    self.report(DEBUG, "alternative_path", length=len(self.shortest_path))
+
+    def adjacent_tiles(self, position):
+        return [(position[0] + x, position[1] + y) for x, y in [(0, 1), (0, -1), (1, 0), (-1, 0)] if
+                self.board.in_bounds((position[0] + x, position[1] + y))]
+
+    def tile_from_position(self, position):
+        return self.board.tile_from_pixel(position)
+
+    def position_from_tile(self, tile):
+        return self.board.pixel_from_tile(tile)
+
+    def snake_body_as_tiles(self):
+        # Snake state is already held in tile coordinates
+        return list(self.snake.body)
+
+    def eat_food_and_check(self, win_label):
+        # Shared bookkeeping after the head has landed on a new tile
+        if self.snake.head_position in self.board.foods:
+            self.snake.grow_pending = True
+            self.foods_collected += 1
+            self.board.foods.remove(self.snake.head_position)
+            self.report(DEBUG, "food_eaten", foods_collected=self.foods_collected)
+            # Check if the snake has collected enough food to go to the next run
+            # A run is won once as many foods are eaten as its layout started with
+            if self.foods_collected == len(self.board.layout.foods):
+                self.win_counter += 1
+                self.report(INFO, "run_won", check=win_label, wins=self.win_counter, move_counter=self.move_counter)
+                self.next_run("won")
+
+    def step(self):
+        """Advance the simulation by exactly one tick."""
+        if self.game_over:
+            return
+        if self.trace is not None:
+            self.trace.before_step(self)
+        if self.instrumentation is None:
+            self.advance_tick()
+        else:
+            instrumentation = self.instrumentation
+            phase_seconds = instrumentation.phase_seconds
+            planning_before = phase_seconds["planning"]
+            rendering_before = phase_seconds["rendering"]
+            start_time = instrumentation.now()
+            self.advance_tick()
+            # Whatever the planners (and an on_run_end frame) did not spend is simulation time
+            elapsed = instrumentation.now() - start_time
+            instrumentation.add_time("simulation", elapsed - (phase_seconds["planning"] - planning_before)
+                                     - (phase_seconds["rendering"] - rendering_before))
+            instrumentation.count("ticks")
+        if self.trace is not None:
+            self.trace.append(self)
+
+    def advance_tick(self):
+        self.tick += 1
+
+        if self.replan_each_tick and self.move_sequence and not getattr(self.planner, "time_expanded", False):
+            self.refresh_move_sequence()
+
+        # Move the snake based on the move sequence
+        if self.move_sequence:
+            next_tile = self.move_sequence[0]  # Get the next move from the sequence
+            # Try moving the snake according to the next move
+            self.snake.move(next_tile)
+            # Check if the snake successfully moved to the next tile
+            if self.snake.head_position == next_tile:
+                # If successful, remove the move from the sequence
+                self.move_sequence.pop(0)
+                self.move_counter += 1
+                if self.metrics is not None:
+                    self.metrics.count("moves")
+                self.apply_penalty(next_tile)
+                self.eat_food_and_check(1)
+                # Check if the snake collided with black boxes
+                if self.check_collision_with_black_boxes():
+                    self.report(INFO, "collision", check=2, wins=self.win_counter, move_counter=self.move_counter)
+                    self.next_run("collision")
+        else:
+            # Generate new move sequence
+            self.generate_path_to_food_with_obstacles()
+            if self.metrics is not None:
+                self.metrics.count("replans")
+                self.metrics.observe("path_length", len(self.shortest_path))
+            if self.shortest_path:
+                self.move_sequence = self.shortest_path.copy()
+                if self.move_sequence:
+                    if len(self.move_sequence) == 1:
+                        self.foods_collected -= 1
+                    next_tile = self.move_sequence.pop(0)
+                    self.snake.move(next_tile)
+                    self.move_counter += 1
+                    if self.metrics is not None:
+                        self.metrics.count("moves")
+                    self.apply_penalty(next_tile)
+                    self.eat_food_and_check(3)
+                    if self.check_collision_with_black_boxes():
+                        self.report(INFO, "collision", check=4, wins=self.win_counter,
+                                    move_counter=self.move_counter)
+                        self.next_run("collision")
+
+        if self.game_over:
+            return
+
+        # Update positions of black boxes
+        for box in self.black_boxes:
+            box.move(self.tick)
+        self.bomb_tick = self.tick
+
+        # Check for collisions with black boxes
+        if self.check_collision_with_black_boxes():
+            self.report(INFO, "collision", check=5, wins=self.win_counter, move_counter=self.move_counter)
+            self.next_run("collision")
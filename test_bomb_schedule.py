@@ -0,0 +1,39 @@
+"""BombSchedule against bombs stepped one tick at a time with Bomb.move.
+
+    python -m pytest test_bomb_schedule.py
+"""
+import pytest
+
+from bomb_schedule import BombSchedule
+from grid import OccupancyGrid
+from layouts import generate_layout
+from snake_engine import Bomb
+
+
+@pytest.mark.parametrize("size, bomb_count, bomb_phase, start_tick", [
+    (12, 5, 3, 0),
+    (17, 9, 7, 41),
+    (35, 8, 13, 250),
+])
+def test_schedule_matches_live_bombs(size, bomb_count, bomb_phase, start_tick):
+    layout = generate_layout(size, 5, bomb_count, f"bombs/{size}", bomb_placement="random")
+    occupancy = OccupancyGrid(size)
+    # Placed the way HeadlessGame.reset_run places them
+    bombs = [Bomb((column, row), start_tick, occupancy=occupancy, size=size, direction=direction)
+             for column, row, direction in layout.bombs]
+    for bomb in bombs:
+        bomb.advance(bomb_phase)
+    schedule = BombSchedule(bombs, size)
+    assert schedule.positions_at(start_tick) == [bomb.position for bomb in bombs]
+
+    columns = {bomb.position[0] for bomb in bombs}
+    for tick in range(start_tick + 1, start_tick + 2 * schedule.period + 1):
+        for bomb in bombs:
+            bomb.move(tick)
+        positions = [bomb.position for bomb in bombs]
+        assert schedule.positions_at(tick) == positions, tick
+        assert schedule.cells_at(tick) == {row * size + column for column, row in positions}
+        for column in columns:
+            for row in range(size):
+                assert schedule.is_occupied((column, row), tick) == ((column, row) in positions)
+                assert occupancy.is_blocked((column, row)) == ((column, row) in positions)
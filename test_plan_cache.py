@@ -0,0 +1,92 @@
+"""PlanCache invalidation, and the paths HeadlessGame.plan() hands out from it.
+
+    python -m pytest test_plan_cache.py
+"""
+import pytest
+
+from grid import OccupancyGrid
+from plan_cache import PlanCache
+from snake_engine import HeadlessGame
+
+PATH = [(0, 0), (1, 0), (2, 0), (3, 0), (3, 1)]
+GOALS = ((3, 1),)
+
+
+def watched_cache(size=5):
+    occupancy = OccupancyGrid(size)
+    cache = PlanCache()
+    cache.watch(occupancy)
+    cache.store("bfs", GOALS, PATH)
+    return cache, occupancy
+
+
+def test_lookup_returns_the_suffix_from_any_tile():
+    cache, _ = watched_cache()
+    for index, tile in enumerate(PATH):
+        assert cache.lookup("bfs", tile, GOALS) == PATH[index:]
+    assert cache.lookup("a_star", PATH[0], GOALS) is None
+    assert cache.lookup("bfs", (4, 4), GOALS) is None
+
+
+def test_path_also_answers_its_own_goal():
+    cache, _ = watched_cache()
+    cache.store("bfs", ((3, 1), (0, 4)), PATH)
+    assert cache.lookup("bfs", (1, 0), ((3, 1),)) == PATH[1:]
+    assert cache.lookup("bfs", (1, 0), ((3, 1), (0, 4))) == PATH[1:]
+
+
+def test_filled_cell_invalidates_the_earlier_suffixes():
+    cache, occupancy = watched_cache()
+    occupancy.add((3, 0))
+    for tile in PATH[:3]:
+        assert cache.lookup("bfs", tile, GOALS) is None
+    assert cache.lookup("bfs", (3, 0), GOALS) == PATH[3:]
+    assert cache.lookup("bfs", (3, 1), GOALS) == PATH[4:]
+
+
+def test_head_stepping_onto_a_suffix_start_keeps_it():
+    cache, occupancy = watched_cache()
+    occupancy.add((0, 0))
+    occupancy.add((1, 0))
+    assert cache.lookup("bfs", (1, 0), GOALS) == PATH[1:]
+
+
+def test_freeing_the_cell_again_does_not_restore_the_suffixes():
+    cache, occupancy = watched_cache()
+    occupancy.add((2, 0))
+    occupancy.remove((2, 0))
+    occupancy.add((4, 4))
+    assert cache.lookup("bfs", (1, 0), GOALS) is None
+    assert cache.lookup("bfs", (2, 0), GOALS) == PATH[2:]
+
+
+def test_watching_a_new_grid_clears_the_cache():
+    cache, occupancy = watched_cache()
+    new_occupancy = OccupancyGrid(5)
+    cache.watch(new_occupancy)
+    assert cache.lookup("bfs", PATH[0], GOALS) is None
+    assert new_occupancy.on_occupied == cache.invalidate_cell
+    # Paths stored after the switch are invalidated by the new grid only
+    cache.store("bfs", GOALS, PATH)
+    occupancy.add((3, 0))
+    assert cache.lookup("bfs", PATH[0], GOALS) == PATH
+
+
+@pytest.mark.parametrize("replan_each_tick", [False, True])
+@pytest.mark.parametrize("search_method", ["bfs", "a_star", "jps"])
+def test_game_plans_are_free_on_the_current_board(search_method, replan_each_tick):
+    game = HeadlessGame(search_method=search_method, replan_each_tick=replan_each_tick, seed=7)
+    plan = game.plan
+    checked = []
+
+    def checked_plan(start, goals):
+        path = plan(start, goals)
+        for tile in path[1:]:
+            assert not game.board.occupancy.is_blocked(tile), (game.tick, start, path)
+        checked.append(path)
+        return path
+
+    game.plan = checked_plan
+    game.run(max_ticks=3000)
+    assert checked
+    assert game.plan_cache.hits
@@ -0,0 +1,111 @@
+"""Every registered planner against plain BFS on random boards and edge cases.
+
+    python -m pytest test_planners.py
+"""
+import random
+
+import pytest
+
+from grid import OccupancyGrid
+from planners import available_planners, get_planner, sweep
+
+# Depth-capped search that returns the first path it reaches, not the shortest
+NOT_SHORTEST = {"iddfs"}
+RANDOM_BOARDS = 1000
+
+
+def make_planner(name):
+    try:
+        return get_planner(name)
+    except ImportError as error:
+        pytest.skip(f"{name} needs an optional dependency: {error}")
+
+
+def random_board(rng):
+    size = rng.randrange(1, 17)
+    obstacles = OccupancyGrid(size)
+    density = rng.choice([0.0, 0.05, 0.2, 0.4])
+    for cell in range(size * size):
+        if rng.random() < density:
+            obstacles.cells[cell] = 1
+    start = (rng.randrange(size), rng.randrange(size))
+    # The start is the snake's head, so it is usually occupied
+    obstacles.cells[start[1] * size + start[0]] = rng.random() < 0.5
+    goals = [(rng.randrange(size), rng.randrange(size)) for _ in range(rng.choice([1, 1, 2, 5]))]
+    return start, goals, obstacles
+
+
+def check_path(path, start, goals, obstacles):
+    assert path[0] == start
+    assert path[-1] in goals
+    for (column, row), (next_column, next_row) in zip(path, path[1:]):
+        assert abs(column - next_column) + abs(row - next_row) == 1
+    for tile in path[1:]:
+        assert 0 <= tile[0] < obstacles.size and 0 <= tile[1] < obstacles.size
+        assert not obstacles.is_blocked(tile)
+
+
+@pytest.mark.parametrize("name", available_planners())
+def test_random_boards_match_bfs(name):
+    planner = make_planner(name)
+    reference = get_planner("bfs")
+    rng = random.Random(f"planners/{name}")
+    for _ in range(RANDOM_BOARDS):
+        start, goals, obstacles = random_board(rng)
+        expected = reference.plan(start, goals, obstacles)
+        path = planner.plan(start, goals, obstacles)
+        if path:
+            check_path(path, start, goals, obstacles)
+        if name in NOT_SHORTEST:
+            assert len(path) >= len(expected)
+        else:
+            assert len(path) == len(expected), (start, goals, obstacles.cells)
+
+
+@pytest.mark.parametrize("name", available_planners())
+def test_blocked_start(name):
+    obstacles = OccupancyGrid(5)
+    obstacles.add((2, 2))
+    path = make_planner(name).plan((2, 2), [(4, 2)], obstacles)
+    assert len(path) == 3
+    check_path(path, (2, 2), [(4, 2)], obstacles)
+
+
+@pytest.mark.parametrize("name", available_planners())
+def test_blocked_goal(name):
+    obstacles = OccupancyGrid(5)
+    obstacles.add((4, 2))
+    assert make_planner(name).plan((0, 2), [(4, 2)], obstacles) == []
+
+
+@pytest.mark.parametrize("name", available_planners())
+def test_walled_in_goal(name):
+    obstacles = OccupancyGrid(7)
+    for tile in [(4, 3), (2, 3), (3, 4), (3, 2)]:
+        obstacles.add(tile)
+    assert make_planner(name).plan((0, 0), [(3, 3)], obstacles) == []
+
+
+@pytest.mark.parametrize("name", available_planners())
+def test_no_goals(name):
+    assert make_planner(name).plan((1, 1), [], OccupancyGrid(5)) == []
+
+
+@pytest.mark.parametrize("name", available_planners())
+def test_start_is_goal(name):
+    assert make_planner(name).plan((1, 1), [(1, 1), (3, 3)], OccupancyGrid(5)) == [(1, 1)]
+
+
+def test_numpy_sweep_matches_sweep():
+    planner = make_planner("numpy_field")
+    rng = random.Random("planners/numpy_sweep")
+    for _ in range(RANDOM_BOARDS):
+        start, goals, obstacles = random_board(rng)
+        expected = sweep(start, obstacles)
+        field = planner.sweep(start, obstacles, goals)
+        assert field.nearest(goals) == expected.nearest(goals)
+        for goal in goals:
+            path = field.path_to(goal)
+            assert len(path) == len(expected.path_to(goal))
+            if path:
+                check_path(path, start, [goal], obstacles)
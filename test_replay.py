@@ -0,0 +1,41 @@
+"""Record an episode, save it, load it back and replay it.
+
+    python -m pytest test_replay.py
+"""
+import pytest
+
+from layouts import GeneratedLayouts
+from replay import TICK_RECORD, ReplayLog, ReplayMismatch, record_episode, replay
+
+
+@pytest.fixture
+def saved_episode(tmp_path):
+    game = record_episode(search_method="bfs", seed=11, bomb_phase=2, total_runs=3,
+                          layouts=GeneratedLayouts(16, 6, 4, seed=5, bomb_placement="random"))
+    path = tmp_path / "episode.replay"
+    game.save(path)
+    return game, path
+
+
+def test_record_save_replay_round_trip(saved_episode):
+    game, path = saved_episode
+    log = ReplayLog.load(path)
+    assert len(log) == game.tick
+    assert log.records == game.records
+    assert log.results == game.run_results
+    replayed = replay(log)
+    assert replayed.records == game.records
+    assert replayed.run_results == game.run_results
+
+
+def test_replay_stops_at_the_first_changed_tick(saved_episode):
+    _, path = saved_episode
+    log = ReplayLog.load(path)
+    index = len(log) // 2
+    tick, column, row, flags = TICK_RECORD.unpack_from(log.records, index * TICK_RECORD.size)
+    records = bytearray(log.records)
+    TICK_RECORD.pack_into(records, index * TICK_RECORD.size, tick, column, row, flags ^ 1)
+    log.records = bytes(records)
+    with pytest.raises(ReplayMismatch) as mismatch:
+        replay(log)
+    assert mismatch.value.tick == tick
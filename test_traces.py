@@ -0,0 +1,47 @@
+"""Traces written during a game and read back through NumPy.
+
+    python -m pytest test_traces.py
+"""
+import os
+
+import pytest
+
+from layouts import GeneratedLayouts
+from replay import TICK_RECORD, RecordingGame
+from traces import NO_TILE, TraceWriter, read_header, read_trace, record_dtype, record_struct
+
+np = pytest.importorskip("numpy")
+
+
+def test_read_trace_layout_and_contents(tmp_path):
+    path = tmp_path / "episode.trace"
+    # Small batches, so the file is written in several flushes
+    with TraceWriter(path, path_slots=4, metadata={"planner": "bfs"}, buffer_records=16) as trace:
+        game = RecordingGame(search_method="bfs", seed=11, total_runs=3, trace=trace,
+                             layouts=GeneratedLayouts(16, 6, 4, seed=5, bomb_placement="random"))
+        game.run()
+
+    header, records = read_trace(path)
+    assert header["metadata"] == {"planner": "bfs"}
+    assert (header["bomb_count"], header["path_slots"], header["board_size"]) == (4, 4, 16)
+    dtype = record_dtype(4, 4)
+    assert records.dtype == dtype
+    assert dtype.itemsize == header["record_size"] == record_struct(4, 4).size
+    assert records["bombs"].shape == (game.tick, 4, 2)
+    assert records["path"].shape == (game.tick, 4, 2)
+    # Records start on an 8-byte boundary and fill the rest of the file exactly
+    _, offset = read_header(path)
+    assert offset % 8 == 0
+    assert os.path.getsize(path) == offset + len(records) * dtype.itemsize
+
+    # The same ticks, heads and event flags as the replay recording of the game
+    expected = np.array(list(TICK_RECORD.iter_unpack(game.records)))
+    assert len(records) == trace.records_written == game.tick
+    assert (records["tick"] == expected[:, 0]).all()
+    assert (records["head"] == expected[:, 1:3]).all()
+    assert (records["flags"] == expected[:, 3]).all()
+    assert records["run"][-1] == 3
+    # Unused path slots are padding
+    unused = np.arange(4) >= records["path_length"][:, None]
+    assert unused.any()
+    assert (records["path"][unused] == NO_TILE).all()
@@ -0,0 +1,227 @@
+"""Fixed-width per-tick traces of a game, written in bulk and read back with NumPy.
+
+A trace file is a small header followed by one record per tick, all the same
+size, so the records can be memory-mapped as a NumPy structured array and
+sliced by field without parsing anything:
+
+    magic b"SNKT", uint16 version, uint32 header length    (FILE_HEADER)
+    header: JSON with the record layout (bomb count, path slots) and metadata,
+        padded so the records start on an 8-byte boundary
+    records: little-endian, packed, fields as in ``record_fields``
+
+The path field holds the first ``path_slots`` tiles still planned after the
+tick (the snake's move sequence), padded with NO_TILE; ``path_length`` is
+its full length. Flags use the event bits of replay.py. A tick that ends a
+run records how the run ended (its RunResult and the snake and bombs at the
+end), not the start of the next one.
+
+Writing needs only the standard library; reading needs NumPy.
+
+    with TraceWriter("episode.trace", metadata={"planner": "bfs"}) as trace:
+        HeadlessGame(search_method="bfs", trace=trace).run()
+    header, records = read_trace("episode.trace")
+    records["penalties"].max(), (records["flags"] & COLLISION).any()
+"""
+import json
+import struct
+import sys
+
+from replay import COLLISION, FOOD_EATEN, PENALTY, RUN_WON
+
+MAGIC = b"SNKT"
+VERSION = 1
+FILE_HEADER = struct.Struct("<4sHI")
+# Padding for unused path slots
+NO_TILE = 0xFFFF
+
+
+def record_fields(bomb_count, path_slots):
+    """(name, struct code, NumPy type, count) for every field of a record."""
+    return [
+        ("tick", "I", "<u4", 1),
+        ("run", "H", "<u2", 1),
+        ("head", "H", "<u2", 2),
+        ("body_length", "I", "<u4", 1),
+        ("foods_collected", "H", "<u2", 1),
+        ("move_counter", "I", "<u4", 1),
+        ("penalties", "H", "<u2", 1),
+        ("flags", "B", "u1", 1),
+        ("bombs", "H", "<u2", 2 * bomb_count),
+        ("path_length", "I", "<u4", 1),
+        ("path", "H", "<u2", 2 * path_slots),
+    ]
+
+
+def record_struct(bomb_count, path_slots):
+    return struct.Struct("<" + "".join(f"{count}{code}" for _, code, _, count in record_fields(bomb_count, path_slots)))
+
+
+def record_dtype(bomb_count, path_slots):
+    import numpy as np
+
+    fields = []
+    for name, _, numpy_type, count in record_fields(bomb_count, path_slots):
+        if name == "head":
+            fields.append((name, numpy_type, (2,)))
+        elif name in ("bombs", "path"):
+            # Tiles come out as (column, row) pairs
+            fields.append((name, numpy_type, (count // 2, 2)))
+        else:
+            fields.append((name, numpy_type))
+    return np.dtype(fields)
+
+
+class TraceWriter:
+    """Collects one record per tick from a game and writes them in batches.
+
+    Pass it to HeadlessGame as ``trace`` (or assign ``game.trace``) and the
+    game hands it every tick it steps. The record layout is fixed by the
+    first game state seen, so every run in a file must have the same number
+    of bombs.
+    """
+
+    def __init__(self, path, path_slots=16, metadata=None, buffer_records=4096):
+        self.path = path
+        self.path_slots = path_slots
+        self.metadata = metadata or {}
+        self.buffer_records = buffer_records
+        self.output = None
+        self.record = None
+        self.buffer = bytearray()
+        self.buffered = 0
+        self.records_written = 0
+        # What the previous tick left behind, to turn state changes into event flags
+        # and, when a run ends, to record how it ended rather than the next start
+        self.board = None
+        self.snake = None
+        self.bomb_schedule = None
+        self.foods_left = 0
+        self.penalties = 0
+        self.runs_finished = 0
+
+    def open(self, game):
+        self.bomb_count = len(game.black_boxes)
+        self.record = record_struct(self.bomb_count, self.path_slots)
+        header = json.dumps({
+            "bomb_count": self.bomb_count,
+            "path_slots": self.path_slots,
+            "board_size": game.board.size,
+            "record_size": self.record.size,
+            "metadata": self.metadata,
+        }).encode()
+        header += b" " * (-(FILE_HEADER.size + len(header)) % 8)
+        self.output = open(self.path, "wb")
+        self.output.write(FILE_HEADER.pack(MAGIC, VERSION, len(header)))
+        self.output.write(header)
+
+    def before_step(self, game):
+        """Note the state a tick starts from; the game calls this before every step."""
+        if self.output is None:
+            self.open(game)
+        self.board = game.board
+        self.snake = game.snake
+        self.bomb_schedule = game.bomb_schedule
+        self.foods_left = len(game.board.foods)
+        self.penalties = game.penalties
+        self.runs_finished = len(game.run_results)
+
+    def append(self, game):
+        """Add the record of the tick just stepped; the game calls this after every step."""
+        if len(game.black_boxes) != self.bomb_count:
+            raise ValueError(f"Trace holds {self.bomb_count} bombs per tick, the game now has {len(game.black_boxes)}")
+
+        flags = 0
+        if len(self.board.foods) < self.foods_left:
+            flags |= FOOD_EATEN
+        if len(game.run_results) > self.runs_finished:
+            # The game has already moved on to the next run (or ended)
+            result = game.run_results[-1]
+            flags |= COLLISION if result.outcome == "collision" else RUN_WON
+            run, snake, foods_collected, move_counter, penalties = (
+                result.run, self.snake, result.foods_collected, result.move_counter, result.penalties)
+            bombs = self.bomb_schedule.positions_at(game.bomb_tick)
+            path = ()
+        else:
+            run, snake, foods_collected, move_counter, penalties = (
+                game.current_run, game.snake, game.foods_collected, game.move_counter, game.penalties)
+            bombs = game.bomb_tiles()
+            path = game.move_sequence
+        if penalties > self.penalties:
+            flags |= PENALTY
+
+        values = [game.tick, run, *snake.head_position, len(snake), foods_collected, move_counter, penalties, flags]
+        for column, row in bombs:
+            values += (column, row)
+        values.append(len(path))
+        for column, row in path[:self.path_slots]:
+            values += (column, row)
+        values += [NO_TILE] * (2 * (self.path_slots - min(len(path), self.path_slots)))
+        self.buffer += self.record.pack(*values)
+        self.buffered += 1
+        if self.buffered >= self.buffer_records:
+            self.flush()
+
+    def flush(self):
+        if self.output is not None and self.buffer:
+            self.output.write(self.buffer)
+            self.records_written += self.buffered
+            self.buffer.clear()
+            self.buffered = 0
+
+    def close(self):
+        self.flush()
+        if self.output is not None:
+            self.output.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def read_header(path):
+    with open(path, "rb") as trace_file:
+        magic, version, header_length = FILE_HEADER.unpack(trace_file.read(FILE_HEADER.size))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} trace file")
+        return json.loads(trace_file.read(header_length)), FILE_HEADER.size + header_length
+
+
+def read_trace(path):
+    """The header and a read-only memory-mapped structured array of the records."""
+    import numpy as np
+
+    header, offset = read_header(path)
+    dtype = record_dtype(header["bomb_count"], header["path_slots"])
+    with open(path, "rb") as trace_file:
+        trace_file.seek(0, 2)
+        count = (trace_file.tell() - offset) // dtype.itemsize
+    if count == 0:
+        return header, np.zeros(0, dtype=dtype)
+    return header, np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=(count,))
+
+
+def summarize(records):
+    """Per-file totals straight from the mapped columns."""
+    flags = records["flags"]
+    planned = records["path_length"]
+    return {
+        "ticks": len(records),
+        "foods": int((flags & FOOD_EATEN != 0).sum()),
+        "penalties": int((flags & PENALTY != 0).sum()),
+        "collisions": int((flags & COLLISION != 0).sum()),
+        "runs_won": int((flags & RUN_WON != 0).sum()),
+        "mean_planned_path": float(planned[planned > 0].mean()) if (planned > 0).any() else 0.0,
+        "max_body_length": int(records["body_length"].max()) if len(records) else 0,
+    }
+
+
+def main():
+    for path in sys.argv[1:]:
+        header, records = read_trace(path)
+        print(path, header["metadata"], summarize(records))
+
+
+if __name__ == "__main__":
+    main()